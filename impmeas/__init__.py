@@ -1,7 +1,6 @@
-from .representation import Formula, Table, BuddyNode, PseudoBoolFunc, buddy_initialize, set_pmc_solver, GPMC
-from .representation.utils import iter_assignments
+from .representation import Formula, Table, BitTable, CNFFunction, BuddyNode, PseudoBoolFunc, buddy_initialize, set_pmc_solver, GPMC, ModelCounter, DPLLCounter, CountCache, clear_formula_cache, set_formula_cache_size
+from .representation.utils import write_dimacs, read_dimacs, iter_assignments, assignment_matrix, iter_indices, assignment2index, index2assignment, reindex, popcount
 from .mc import totalizer, at_most_cnf
-from .mapping import influence, banzhaf, shapley, blame, dominating_cgm, hkr_cgm, rectifying_cgm, influence_cnf
-from .convenient import random_assignment, random_table, random_subset, random_k_cnf, set2ass, random_module, parse_dimacs
-from .fallback import scs, d, mscs
+from .mapping import influence, banzhaf, influence_all, banzhaf_all, shapley, shapley_all, blame, scs, d, mscs, scs_many, d_many, mscs_many, dominating_cgm, hkr_cgm, rectifying_cgm, influence_cnf
+from .convenient import random_assignment, random_table, random_subset, random_k_cnf, set2ass, random_module, parse_dimacs, balanced
 from .ranking import Ranking, ranking_from_val
\ No newline at end of file
@@ -1 +1,3 @@
-from .cgm import omega, upsilon
\ No newline at end of file
+from .basic import banzhaf_all, influence_all, shapley, shapley_all
+from .cgm import omega, upsilon, hkr
+from .blame import scs_many, d_many, mscs_many
@@ -0,0 +1,105 @@
+from ..representation import BuddyNode
+from collections import defaultdict
+import numpy as np
+import math
+
+def _reach(f: BuddyNode, nodes: list[tuple[int, str, int, int]]) -> dict[int, float]:
+    # probability that a uniformly random assignment passes through a node
+    reach = defaultdict(float)
+    reach[f.node_id] = 1.0
+    for node_id, _, low, high in nodes:
+        reach[low] += reach[node_id]/2
+        reach[high] += reach[node_id]/2
+    return reach
+
+def banzhaf_all(f: BuddyNode) -> dict[str, float]:
+    # every path that skips the level of x contributes equally to E[f[x/1]] and E[f[x/0]],
+    # so only the nodes labeled with x matter
+    nodes = f.iter_nodes()
+    prob, reach = f.probabilities(), _reach(f, nodes)
+    values = { x: 0.0 for x in f.vars }
+    for node_id, x, low, high in nodes:
+        values[x] += reach[node_id]*(prob[high] - prob[low])
+    return values
+
+def _differ(f: BuddyNode, nodes: list[tuple[int, str, int, int]]) -> callable:
+    # returns differ(a, b), the probability that the nodes a and b of f disagree on a uniformly random
+    # assignment. Pairs are split at their topmost level and memoized, so no BDD operations are needed.
+    level = { x: BuddyNode.var(x).level for x in f.vars }
+    children = { node_id: (level[x], low, high) for node_id, x, low, high in nodes }
+    children.update({ 0: (math.inf, 0, 0), 1: (math.inf, 1, 1) })
+    memo = {}
+    def split(a, b):
+        (la, a0, a1), (lb, b0, b1) = children[a], children[b]
+        if la > lb: a0 = a1 = a
+        if lb > la: b0 = b1 = b
+        return [ (a0, b0), (a1, b1) ]
+    def lookup(a, b):
+        if a == b: return 0.0
+        if a in (0,1) and b in (0,1): return 1.0
+        return memo.get((min(a,b), max(a,b)))
+    def differ(root_a, root_b):
+        # iterative post-order traversal of the pairs (the depth is bounded by the number of levels)
+        stack = [ (root_a, root_b) ]
+        while len(stack) > 0:
+            a, b = stack[-1]
+            if lookup(a, b) is not None:
+                stack.pop()
+                continue
+            pairs = split(a, b)
+            missing = [ pair for pair in pairs if lookup(*pair) is None ]
+            if len(missing) > 0:
+                stack += missing
+                continue
+            memo[(min(a,b), max(a,b))] = sum(lookup(*pair) for pair in pairs)/2
+            stack.pop()
+        return lookup(root_a, root_b)
+    return differ
+
+def influence_all(f: BuddyNode) -> dict[str, float]:
+    # x is influential on a path iff the children of the node labeled x on that path differ
+    nodes = f.iter_nodes()
+    reach, differ = _reach(f, nodes), _differ(f, nodes)
+    values = { x: 0.0 for x in f.vars }
+    for node_id, x, low, high in nodes:
+        values[x] += reach[node_id]*differ(low, high)
+    return values
+
+def _add(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+    # adds two polynomials of possibly different length
+    if len(p1) < len(p2): p1, p2 = p2, p1
+    return p1 + np.concatenate([p2, np.zeros(len(p1)-len(p2))])
+
+def shapley_all(f: BuddyNode) -> dict[str, float]:
+    # counts, for every variable x and every k, the difference between the number of
+    # coalitions S of size k with f(S+x)=1 and those with f(S)=1. Polynomials (arrays
+    # indexed by the number of true variables) are propagated bottom-up (satisfying
+    # assignments below a node) and top-down (paths from the root to a node).
+    nodes = f.iter_nodes()
+    X = sorted(f.vars, key=lambda x: BuddyNode.var(x).level)
+    n = len(X)
+    rank, binom, below = f._weight_polynomials(X, nodes, dtype=np.float64)
+    gap = lambda a, b: binom[rank[b] - rank[a] - 1]
+
+    above = defaultdict(lambda: np.zeros(1))
+    if len(nodes) > 0: above[f.node_id] = binom[rank[f.node_id]]
+    per_size = { x: np.zeros(n) for x in X }
+    for node_id, x, low, high in nodes:
+        lowpoly = np.convolve(gap(node_id, low), below[low])
+        highpoly = np.convolve(gap(node_id, high), below[high])
+        per_size[x] = _add(per_size[x], np.convolve(above[node_id], highpoly - lowpoly))
+        for child, poly in [ (low, np.convolve(above[node_id], gap(node_id, low))),
+                             (high, np.concatenate([[0], np.convolve(above[node_id], gap(node_id, high))])) ]:
+            if child not in [0,1]: above[child] = _add(above[child], poly)
+
+    weights = np.array([ 1/(n*math.comb(n-1,k)) for k in range(n) ])
+    return { x: float(per_size[x] @ weights) for x in X }
+
+def shapley(f: BuddyNode, x: str) -> float:
+    # the coalitions of the other variables are counted by size in f[x/1] and f[x/0]
+    if x not in f.vars: return 0
+    X = [ y for y in f.vars if y != x ]
+    n = len(X) + 1
+    f0, f1 = f.branch(x)
+    c0, c1 = f0.satcount_by_weight(X), f1.satcount_by_weight(X)
+    return sum((c1[k] - c0[k]) / (n*math.comb(n-1,k)) for k in range(n))
@@ -0,0 +1,47 @@
+from ..representation import BuddyNode, assignment_matrix
+from typing import Union
+import numpy as np
+
+def _columns(g: BuddyNode, us, vars: list[str]) -> tuple[list[str], np.ndarray]:
+    # arrays (rows or indices) are over vars, which must be given since the variables of BDDs are unordered
+    X = sorted(g.vars)
+    return X, assignment_matrix(us, X, vars)
+
+def _evaluate_many(f: BuddyNode, us, vars: list[str]) -> np.ndarray:
+    # f[u] for every u in us, computed for all assignments at once in a single bottom-up pass
+    X, U = _columns(f, us, vars)
+    column = { x: idx for idx, x in enumerate(X) }
+    value = { 0: np.zeros(len(U), dtype=np.bool_), 1: np.ones(len(U), dtype=np.bool_) }
+    for node_id, x, low, high in reversed(f.iter_nodes()):
+        value[node_id] = np.where(U[:, column[x]], value[high], value[low])
+    return value[f.node_id]
+
+def _distances_many(g: BuddyNode, fixed: set[str], us, vars: list[str]) -> np.ndarray:
+    # minimal number of flips that lead from each u to a satisfying assignment of g, where the
+    # variables in fixed must not be flipped. Every node stores the cheapest path to the 1-terminal;
+    # taking an edge that disagrees with u costs 1 (or inf if the variable is fixed), skipped
+    # levels are free. All assignments are processed at once in a single bottom-up pass.
+    X, U = _columns(g, us, vars)
+    column = { x: idx for idx, x in enumerate(X) }
+    cost = { 0: np.full(len(U), float("inf")), 1: np.zeros(len(U)) }
+    for node_id, x, low, high in reversed(g.iter_nodes()):
+        flip_cost = float("inf") if x in fixed else 1.0
+        low_cost = np.where(U[:, column[x]], cost[low] + flip_cost, cost[low])
+        high_cost = np.where(U[:, column[x]], cost[high], cost[high] + flip_cost)
+        cost[node_id] = np.minimum(low_cost, high_cost)
+    return cost[g.node_id]
+
+def scs_many(f: BuddyNode, x: str, us: Union[np.ndarray, list[dict[str,bool]]], c=None, vars: list[str] = None) -> np.ndarray:
+    # scs(f,x,u,c) is the distance to the critical assignments with value c, where x is not flipped
+    assert x in f.vars
+    cs = _evaluate_many(f, us, vars) if c is None else np.full(len(us), bool(c))
+    fx = f.flip(x)
+    high = _distances_many(f & ~fx, {x}, us, vars)
+    low = _distances_many(~f & fx, {x}, us, vars)
+    return np.where(cs, high, low)
+
+def d_many(f: BuddyNode, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    return _distances_many(f, set(), us, vars)
+
+def mscs_many(f: BuddyNode, x: str, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    return _distances_many(f.boolean_derivative(x), set(), us, vars)
@@ -1,4 +1,5 @@
-from ..representation import BuddyNode, add_buddy_delete_callback
+from ..representation import BuddyNode, Table, add_buddy_delete_callback
+from ..tables.cgm import hkr as table_hkr
 from functools import cache
 
 @cache
@@ -21,5 +22,9 @@ def upsilon(f: BuddyNode):
         high_tf = upsilon(low | high)
         return BuddyNode.var(f.topvar).ite(high_tf, low_tf)
 
+def hkr(f: BuddyNode, kappa = lambda x: 4*(0.5-x)**2) -> Table:
+    # the result is a real-valued function, so the lattice of cofactor expectations is computed on the truth table
+    return table_hkr(f.to_table(), kappa)
+
 add_buddy_delete_callback(omega.cache_clear)
 add_buddy_delete_callback(upsilon.cache_clear)
\ No newline at end of file
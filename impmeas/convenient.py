@@ -1,6 +1,7 @@
+import io
 import random
 from typing import Iterable
-from .representation import Table, iter_assignments
+from .representation import Table, iter_assignments, read_dimacs
 
 def random_assignment(vars: Iterable[str]) -> dict[str,bool]:
     return { x: bool(random.randint(0,1)) for idx,x in enumerate(vars) }
@@ -29,33 +30,30 @@ def random_module(X:list[str], Y:list[str], monotone=False) -> tuple[Table,Table
     f = g.ite(f1,f0)
     return f,g,f1,f0
 
+def balanced(op: str, operands: list[tuple]) -> tuple:
+    # combines the operands (parse trees) by an associative operation into a balanced tree
+    # (instead of a chain), which keeps intermediate results small and the depth logarithmic
+    operands = list(operands)
+    if len(operands) == 0: return None
+    while len(operands) > 1:
+        paired = [ (op, operands[i], operands[i+1]) for i in range(0, len(operands)-1, 2) ]
+        if len(operands) % 2 == 1: paired.append(operands[-1])
+        operands = paired
+    return operands[0]
+
+def _clause2tree(clause: list[int]) -> tuple:
+    return balanced("|", [ ("V", f"x{lit}") if lit > 0 else ("~", ("V", f"x{-lit}")) for lit in clause ])
+
 def random_k_cnf(n,m,k) -> tuple[list[list[int]], tuple]:
-    cnf, formula = [], ""
-    for ctr in range(m):
-        clause = [(random.randint(0,1)*2-1)*random.randint(1,n) for _ in range(k)]
-        inner = None
-        for el in clause:
-            val = ("V", f"x{el}") if el >= 0 else ("~", ("V", f"x{-el}"))
-            if not inner: inner = val
-            else: inner = ("|", inner, val)
-        formula = ("&", formula, inner) if ctr > 0 else inner 
-        cnf.append(clause)
+    cnf = [ [(random.randint(0,1)*2-1)*random.randint(1,n) for _ in range(k)] for _ in range(m) ]
+    formula = balanced("&", [ _clause2tree(clause) for clause in cnf ]) if m > 0 else ""
     return cnf, formula
 
 def parse_dimacs(dimacs) -> tuple[tuple, list, int, int]:
-    formula, cnf, nvars, nclauses = None, [], None, None
-    for el in dimacs.strip().split("\n"):
-        if el.startswith("c"): continue
-        elif el.startswith("p"):
-            # vars clauses
-            nvars = int(el.split()[2])
-            nclauses = int(el.split()[3])
-        else:
-            clause = [ int(val) for val in el.split()[:-1] ]
-            cnf.append(clause)
-            inner = None
-            for lit in clause:
-                littpl = ("V", f"x{lit}") if lit > 0 else ("~", ("V", f"x{-lit}"))
-                inner = ("|", inner, littpl) if inner else littpl
-            formula = ("&", inner, formula) if formula else inner
-    return formula, cnf, nvars, nclauses
\ No newline at end of file
+    # dimacs is either the content of a DIMACS file or a (text) file object, which is read line by line
+    if isinstance(dimacs, str): dimacs = io.StringIO(dimacs)
+    clauses, header = read_dimacs(dimacs)
+    cnf = list(clauses)
+    nvars, nclauses = header.get("nr_vars"), header.get("nr_clauses")
+    formula = balanced("&", [ _clause2tree(clause) for clause in cnf ])
+    return formula, cnf, nvars, nclauses
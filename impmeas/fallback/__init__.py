@@ -1,3 +1,3 @@
-from .basic import influence, banzhaf, shapley, expectation_of_contributions, influence_cnf
-from .blame import blame, scs, d, mscs
+from .basic import influence, banzhaf, influence_all, banzhaf_all, shapley, shapley_all, expectation_of_contributions, influence_cnf
+from .blame import blame, scs, d, mscs, scs_many, d_many, mscs_many
 from .cgm import omega, nu, hkr
\ No newline at end of file
@@ -1,9 +1,10 @@
-from ..representation import PseudoBoolFunc, iter_assignments, BuddyNode, GPMC
+from ..representation import PseudoBoolFunc, BuddyNode, ModelCounter, popcount
+import numpy as np
 import math
 from typing import Callable, Union
 
 
-def influence_cnf(cnf:list, x:int, solver: GPMC):
+def influence_cnf(cnf:list, x:int, solver: ModelCounter):
     # method from Traxler, 2009, Variable influences in conjunctive normal forms
     cnf_simp = [cl for cl in cnf if all((lit not in cl) or (-lit not in cl) for lit in cl)]
     vars_simp_cnf = max(max(abs(lit) for lit in cl) for cl in cnf_simp)
@@ -24,15 +25,29 @@ def banzhaf(f: PseudoBoolFunc, x: str) -> float:
     f0, f1 = f.branch(x)
     return f1.expectation() - f0.expectation()
 
+def influence_all(f: PseudoBoolFunc) -> dict[str, float]:
+    return { x: influence(f, x) for x in f.vars }
+
+def banzhaf_all(f: PseudoBoolFunc) -> dict[str, float]:
+    return { x: banzhaf(f, x) for x in f.vars }
+
 def shapley(f: PseudoBoolFunc, x: str) -> float: 
     c = lambda k: 1/(len(f.vars)*math.comb(len(f.vars)-1,k))
     return expectation_of_contributions(f,x,c)
 
+def shapley_all(f: PseudoBoolFunc) -> dict[str, float]:
+    return { x: shapley(f, x) for x in f.vars }
+
 def expectation_of_contributions(f: PseudoBoolFunc, x: str, c: Callable[[int],float]) -> float:
     if x not in f.vars: return 0
-    s = 0
-    for ass in iter_assignments(set(f.vars)-{x}):
-        marg = f[ass | {x:True}] - f[ass | {x:False}]
-        s += c(len({y for y in ass if ass[y]}))*marg
+    # x is the least significant bit, so the even and odd indices of a block are the assignments with x=0 and x=1
+    vars = sorted(set(f.vars)-{x}) + [x]
+    weights = np.array([ c(k) for k in range(len(vars)) ])
+    s, offset = 0, 0
+    for block in f.iter_values(vars):
+        block = np.asarray(block, dtype=np.float64)
+        marg = block[1::2] - block[0::2]
+        s += float(np.dot(weights[popcount(np.arange(offset, offset+len(block), 2, dtype=np.int64))], marg))
+        offset += len(block)
     return s
 
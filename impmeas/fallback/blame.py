@@ -1,25 +1,32 @@
-from ..representation import PseudoBoolFunc, iter_assignments, add_buddy_delete_callback, BuddyNode
+from ..representation import PseudoBoolFunc, add_buddy_delete_callback, BuddyNode, var_weights, assignment2index, assignment_matrix
 from functools import cache 
 from itertools import combinations
+from typing import Union
+import numpy as np
 
 def scs(f: PseudoBoolFunc, x: str, u: dict[str,bool], c=None) -> float:
     assert f.is_boolean
     assert x in f.vars
     if c is None: c = f[u]
-    for level in range(len(f.vars)):
-        for S in combinations(set(f.vars)-{x}, level):
-            u_xor_S = u | { y: not u[y] for y in S }
-            u_xor_S_xor_x = u_xor_S | { x: not u[x] }
-            if f[u_xor_S] == c and f[u_xor_S_xor_x] != c:
+    # assignments are encoded as integers, so flipping the variables in S is an xor with their bitmask
+    vars = list(f.vars)
+    weights = var_weights(vars)
+    u_idx = assignment2index(u, vars)
+    for level in range(len(vars)):
+        for S in combinations([ weights[y] for y in vars if y != x ], level):
+            u_xor_S = u_idx ^ sum(S)
+            if f.at_index(u_xor_S, vars) == c and f.at_index(u_xor_S ^ weights[x], vars) != c:
                 return level
     return float("inf")
 
 def d(f: PseudoBoolFunc, u: dict[str,bool]) -> float:
     assert f.is_boolean
-    for level in range(len(f.vars)+1):
-        for S in combinations(set(f.vars), level):
-            u_xor_S = u | { y: not u[y] for y in S }
-            if f[u_xor_S] == 1:
+    vars = list(f.vars)
+    weights = list(var_weights(vars).values())
+    u_idx = assignment2index(u, vars)
+    for level in range(len(vars)+1):
+        for S in combinations(weights, level):
+            if f.at_index(u_idx ^ sum(S), vars) == 1:
                 return level
     return float("inf")
 
@@ -27,28 +34,66 @@ def mscs(f: PseudoBoolFunc, x: str, u: dict[str,bool]) -> float:
     assert f.is_boolean
     return d(f.boolean_derivative(x),u)
 
+def _as_assignments(f: PseudoBoolFunc, us, vars) -> list[dict[str,bool]]:
+    # arrays (rows or indices) are over vars, which defaults to the variables of f if they are ordered
+    if isinstance(us, np.ndarray):
+        if vars is None and isinstance(f.vars, list): vars = f.vars
+        assert vars is not None, "the variables of us must be given"
+        vars = list(vars)
+        return [ dict(zip(vars, map(bool, row))) for row in assignment_matrix(us, vars, vars) ]
+    return list(us)
+
+def _distances_many(g: PseudoBoolFunc, S_domain: list[str], us: list[dict[str,bool]]) -> np.ndarray:
+    # the minimal number of flips of variables in S_domain that lead from each u to a satisfying
+    # assignment of g. The flipped functions g.flip(S) are shared between all assignments.
+    result = np.full(len(us), float("inf"))
+    remaining = list(range(len(us)))
+    for level in range(len(S_domain)+1):
+        for S in combinations(S_domain, level):
+            if len(remaining) == 0: return result
+            g_S = g.flip(set(S)) if level > 0 else g
+            result[[ i for i in remaining if g_S[us[i]] ]] = level
+            remaining = [ i for i in remaining if result[i] == float("inf") ]
+    return result
+
+def scs_many(f: PseudoBoolFunc, x: str, us: Union[np.ndarray, list[dict[str,bool]]], c=None, vars: list[str] = None) -> np.ndarray:
+    # scs(f,x,u,c) for every u in us, which is a list of assignments, a 2D-array whose columns correspond
+    # to vars or a 1D-array of indices of assignments to vars (cf. assignment_matrix)
+    assert f.is_boolean
+    assert x in f.vars
+    us = _as_assignments(f, us, vars)
+    cs = np.array([ f[u] if c is None else c for u in us ], dtype=np.bool_)
+    fx = f.flip(x)
+    result = np.full(len(us), float("inf"))
+    for value, critical in [(True, f & ~fx), (False, ~f & fx)]:
+        selected = np.flatnonzero(cs == value)
+        result[selected] = _distances_many(critical, sorted(set(f.vars)-{x}), [ us[i] for i in selected ])
+    return result
+
+def d_many(f: PseudoBoolFunc, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    # d(f,u) for every u in us (cf. scs_many)
+    assert f.is_boolean
+    return _distances_many(f, sorted(f.vars), _as_assignments(f, us, vars))
+
+def mscs_many(f: PseudoBoolFunc, x: str, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    # mscs(f,x,u) for every u in us (cf. scs_many); the derivative is computed only once
+    assert f.is_boolean
+    return d_many(f.boolean_derivative(x), _as_assignments(f, us, vars))
+
 @cache
 def g(f,x,c,k):
     if k == 0:
         fx = f.flip(x)
         return f & ~fx if c else ~f & fx
     else:
-        g_last = g(f,x,c,k-1)
-        result = g_last
-        for y in set(f.vars) - { x }:
-            result |= g_last.flip(y)
-        return result
+        return g(f,x,c,k-1).flip_closure(set(f.vars) - { x })
 
 @cache
 def g_mod(f,x,k):
     if k == 0:
         return f.boolean_derivative(x)
     else:
-        g_last = g_mod(f,x,k-1)
-        result = g_last
-        for y in set(f.vars) - { x }:
-            result |= g_last.flip(y)
-        return result
+        return g_mod(f,x,k-1).flip_closure(set(f.vars) - { x })
         
 def blame(f: PseudoBoolFunc, x: str, rho = lambda x: 1/(x+1), cutoff=0, modified=False, debug=False):
     assert f.is_boolean
@@ -1,4 +1,4 @@
-from ..representation import PseudoBoolFunc, iter_assignments, Table, add_buddy_delete_callback 
+from ..representation import PseudoBoolFunc, Table, add_buddy_delete_callback, iter_indices, index2assignment, var_weights
 from functools import cache
 
 @cache
@@ -33,15 +33,18 @@ def nu(f: PseudoBoolFunc) -> PseudoBoolFunc:
 
 def hkr(f: PseudoBoolFunc, kappa = lambda x: 4*(0.5-x)**2) -> Table:
     assert f.is_boolean
-    ret = Table.zeros(list(f.vars))
-    for ass in iter_assignments(f.vars):
-        S = {x for x in ass if ass[x]}
+    vars = list(f.vars)
+    weights = var_weights(vars)
+    ret = Table.zeros(vars)
+    for idx in iter_indices(len(vars)):
+        # idx encodes S as the set of true variables
+        S = [ x for x in vars if idx & weights[x] ]
         mean = 0
-        for alpha in iter_assignments(S):
-            f_alpha = f.cofactor(alpha)
+        for alpha in iter_indices(len(S)):
+            f_alpha = f.cofactor(index2assignment(alpha, S))
             mean += kappa(f_alpha.expectation())
         mean = mean / 2**len(S)
-        ret[ass] = mean
+        ret[idx] = mean
     return ret
 
 add_buddy_delete_callback(omega.cache_clear)
@@ -1,37 +1,130 @@
-from . import PseudoBoolFunc, Formula, BuddyNode, Table, GPMC
-from . import mc, bdds, fallback
+from . import PseudoBoolFunc, Formula, BuddyNode, Table, ModelCounter
+from . import mc, bdds, tables, fallback
 from .representation import get_pmc_solver
 from typing import Callable, Union
+import numpy as np
 
-def influence_cnf(cnf: list, x: str, solver: GPMC) -> float:
+def influence_cnf(cnf: list, x: str, solver: ModelCounter) -> float:
     return fallback.influence_cnf(cnf,x,solver)
 
 def influence(f: PseudoBoolFunc, x: str) -> float:
+    if get_pmc_solver() and type(f) == Formula:
+        return mc.influence(f, x)
     return fallback.influence(f, x)
 
+def influence_all(f: PseudoBoolFunc) -> dict[str, float]:
+    if get_pmc_solver() and type(f) == Formula:
+        method = mc.influence_all
+    else:
+        method = {
+            Table: tables.influence_all,
+            BuddyNode: bdds.influence_all,
+        }.get(type(f), fallback.influence_all)
+    return method(f)
+
 def blame(f: PseudoBoolFunc, x: str, rho=lambda x:1/(x+1), cutoff=0,modified=False,debug=False) -> float:
     if get_pmc_solver() and type(f) ==Formula:
         method = mc.blame
-    else: method = fallback.blame
+    else: 
+        method = {
+            Table: tables.blame,
+        }.get(type(f), fallback.blame)
     return method(f=f,x=x,rho=rho,cutoff=cutoff,modified=modified,debug=debug)[0]
 
+def scs(f: PseudoBoolFunc, x: str, u: dict[str,bool], c=None) -> float:
+    method = {
+        Table: tables.scs,
+    }.get(type(f), fallback.scs)
+    return method(f,x,u,c=c)
+
+def d(f: PseudoBoolFunc, u: dict[str,bool]) -> float:
+    method = {
+        Table: tables.d,
+    }.get(type(f), fallback.d)
+    return method(f,u)
+
+def mscs(f: PseudoBoolFunc, x: str, u: dict[str,bool]) -> float:
+    method = {
+        Table: tables.mscs,
+    }.get(type(f), fallback.mscs)
+    return method(f,x,u)
+
+# the *_many functions take us as a list of assignments, a 2D Boolean array whose columns correspond
+# to vars, or a 1D array of indices of assignments to vars (where vars[-1] is the least significant
+# bit, as in tables). For arrays, vars defaults to f.vars if these are ordered (tables, CNF functions)
+# and must be given otherwise (formulas, BDDs).
+def scs_many(f: PseudoBoolFunc, x: str, us: Union[np.ndarray, list[dict[str,bool]]], c=None, vars: list[str] = None) -> np.ndarray:
+    method = {
+        Table: tables.scs_many,
+        BuddyNode: bdds.scs_many,
+    }.get(type(f), fallback.scs_many)
+    return method(f,x,us,c=c,vars=vars)
+
+def d_many(f: PseudoBoolFunc, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    method = {
+        Table: tables.d_many,
+        BuddyNode: bdds.d_many,
+    }.get(type(f), fallback.d_many)
+    return method(f,us,vars=vars)
+
+def mscs_many(f: PseudoBoolFunc, x: str, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    method = {
+        Table: tables.mscs_many,
+        BuddyNode: bdds.mscs_many,
+    }.get(type(f), fallback.mscs_many)
+    return method(f,x,us,vars=vars)
+
 def banzhaf(f: Union[PseudoBoolFunc,tuple[set[str], Callable[[dict[str, bool]],float]]], x: str) -> float:
+    if get_pmc_solver() and type(f) == Formula:
+        return mc.banzhaf(f, x)
     return fallback.banzhaf(f,x)
 
+def banzhaf_all(f: PseudoBoolFunc) -> dict[str, float]:
+    if get_pmc_solver() and type(f) == Formula:
+        method = mc.banzhaf_all
+    else:
+        method = {
+            Table: tables.banzhaf_all,
+            BuddyNode: bdds.banzhaf_all,
+        }.get(type(f), fallback.banzhaf_all)
+    return method(f)
+
 def shapley(f: Union[PseudoBoolFunc,tuple[set[str], Callable[[dict[str, bool]],float]]], x: str) -> float:
-    return fallback.shapley(f,x)
+    if get_pmc_solver() and type(f) == Formula:
+        method = mc.shapley
+    else: 
+        method = {
+            Table: tables.shapley,
+            BuddyNode: bdds.shapley,
+        }.get(type(f), fallback.shapley)
+    return method(f,x)
+
+def shapley_all(f: PseudoBoolFunc) -> dict[str, float]:
+    if get_pmc_solver() and type(f) == Formula:
+        return { x: mc.shapley(f,x) for x in f.vars }
+    method = {
+        Table: tables.shapley_all,
+        BuddyNode: bdds.shapley_all,
+    }.get(type(f), fallback.shapley_all)
+    return method(f)
 
 def dominating_cgm(f: PseudoBoolFunc) -> PseudoBoolFunc:
     method = {
+        Table: tables.omega,
         BuddyNode: bdds.omega,
     }.get(type(f), fallback.omega)
     return method(f)
 
 def rectifying_cgm(f: PseudoBoolFunc) -> PseudoBoolFunc:
     method = {
+        Table: tables.nu,
         BuddyNode: bdds.upsilon,
     }.get(type(f), fallback.nu)
     return method(f)
 
 def hkr_cgm(f: PseudoBoolFunc, kappa = lambda x: 4*(0.5-x)**2) -> Table:
-    return fallback.hkr(f,kappa)
+    method = {
+        Table: tables.hkr,
+        BuddyNode: bdds.hkr,
+    }.get(type(f), fallback.hkr)
+    return method(f,kappa)
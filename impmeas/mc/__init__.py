@@ -1,2 +1,3 @@
+from .basic import shapley, banzhaf, banzhaf_all, influence, influence_all
 from .blame import blame
-from .utils import at_most, at_most_cnf, totalizer
\ No newline at end of file
+from .utils import at_most, at_most_cnf, totalizer, totalizer_network
@@ -0,0 +1,78 @@
+from ..representation import Formula, get_pmc_solver
+from .utils import totalizer_network
+import math
+
+def banzhaf_all(f: Formula, X: list[str] = None) -> dict[str, float]:
+    # f is encoded once; the counts of both cofactors of every variable x are obtained by
+    # adding a unit clause on x to the shared CNF, and all of them are counted at once
+    X = list(f.vars) if X is None else list(X)
+    simp = f.simplify()
+    values = { x: 0.0 for x in X }
+    Y = [ x for x in X if x in simp.vars ]
+    if len(Y) == 0: return values
+
+    cnf, var2idx, newvars = simp.tseitin()
+    cnfs = [ cnf + [[sign*var2idx[x]]] for x in Y for sign in [1, -1] ]
+    counts = get_pmc_solver().satcount_many(cnfs, exists=set(newvars))
+    for i, x in enumerate(Y):
+        values[x] = (counts[2*i] - counts[2*i+1]) / 2**(len(simp.vars)-1)
+    return values
+
+def banzhaf(f: Formula, x: str) -> float:
+    return banzhaf_all(f, [x])[x]
+
+def influence_all(f: Formula, X: list[str] = None) -> dict[str, float]:
+    # the derivative of x is encoded as the miter f ^ f.flip(x); the subformulas that do not
+    # contain x are shared by both sides and get only one Tseitin variable. By symmetry, it
+    # suffices to count the assignments with x=1
+    X = list(f.vars) if X is None else list(X)
+    simp = f.simplify()
+    values = { x: 0.0 for x in X }
+    cnfs, exists, Y = [], [], []
+    for x in X:
+        if x not in simp.vars: continue
+        miter = (simp ^ simp.flip(x)).simplify()
+        if miter == Formula.false or miter == Formula.true:
+            values[x] = float(miter == Formula.true)
+            continue
+        cnf, var2idx, newvars = miter.tseitin(minimize_new_variables=True)
+        units = [[var2idx[x]]] if x in var2idx else []
+        cnfs.append(cnf + units)
+        exists.append(set(newvars))
+        Y.append((x, len(miter.vars) - len(units)))
+    counts = get_pmc_solver().satcount_many(cnfs, exists=exists) if len(cnfs) > 0 else []
+    for (x, n), count in zip(Y, counts):
+        values[x] = count / 2**n
+    return values
+
+def influence(f: Formula, x: str) -> float:
+    return influence_all(f, [x])[x]
+
+def weight_counts(f: Formula, X: list[str]) -> list[int]:
+    # number of models of f over X (which contains the variables of f) with exactly k true variables, k=0..|X|
+    simp = f.simplify()
+    if simp == Formula.false: return [0]*(len(X)+1)
+    if simp == Formula.true: return [ math.comb(len(X), k) for k in range(len(X)+1) ]
+
+    cnf, var2idx, newvars = simp.tseitin()
+    ids = dict(var2idx)
+    offset = newvars[-1]
+    for y in X:
+        if y not in ids:
+            offset += 1
+            ids[y] = offset
+
+    # the network is built once; "at most k" is then selected by a unit clause on output k
+    network, outputs, network_vars = totalizer_network({ ids[y] for y in X }, offset+1)
+    exists = set(newvars) | network_vars
+    cnfs = [ cnf + network + [[-outputs[k]]] for k in range(len(X)) ] + [ cnf + network ]
+    at_most = get_pmc_solver().satcount_many(cnfs, exists=exists)
+    return [ at_most[0] ] + [ at_most[k] - at_most[k-1] for k in range(1, len(X)+1) ]
+
+def shapley(f: Formula, x: str) -> float:
+    if x not in f.vars: return 0
+    X = list(f.vars - {x})
+    n = len(f.vars)
+    f0, f1 = f.branch(x)
+    counts0, counts1 = weight_counts(f0, X), weight_counts(f1, X)
+    return sum( (counts1[k] - counts0[k])/(n*math.comb(n-1,k)) for k in range(n) )
@@ -1,9 +1,11 @@
 from ..representation import Formula, get_pmc_solver 
 from itertools import count
 from typing import Iterable, Union
-from .utils import at_most_cnf, totalizer
+from .utils import totalizer_network
 
-def resp_counts(f: Formula, x: str, debug=False, modified=False) -> Iterable[int]:
+def resp_counts(f: Formula, x: str, debug=False, modified=False, batch=1) -> Iterable[int]:
+    # counts are requested from the solver in batches of `batch` consecutive k. Larger batches run
+    # concurrently on solvers with several workers, but counts past an early stop of the consumer are wasted.
     max_varlength = max(len(v) for v in f.vars)
     new_flip_vars = { f"{'_'*max_varlength}z_{y}": y for y in f.vars-{x} }
     replacements = { new_flip_vars[z]: Formula.parse(("^", ("V", z), ("V", new_flip_vars[z]))) \
@@ -21,18 +23,25 @@ def resp_counts(f: Formula, x: str, debug=False, modified=False) -> Iterable[int
     orig_var_ids = { var2idx[p] for p in f.vars }
     all_var_ids = set(var2idx.values()) | set(newvars)
 
-    for k in count(): 
-        offset = max(max(abs(c) for c in cl) for cl in cnf)+1 
-        # cnf_leqk, new_leqk_vars = at_most_cnf(k, new_flip_var_ids, offset)
-        cnf_leqk, new_leqk_vars = totalizer(k, new_flip_var_ids, offset)
-        exists = (all_var_ids - orig_var_ids) | new_leqk_vars
-        new_cnf = cnf + cnf_leqk
-        if debug and k > 0: print()
-        if debug: print(f"k={k}", end=" ")
-        if debug: print(f"size of cnf: {len(new_cnf)}", end=" ")
-        yield k, get_pmc_solver().satcount(cnf + cnf_leqk, exists=exists)
+    # the totalizer network is built once; "at most k flips" is selected by a unit clause on output k.
+    # the queries for `batch` consecutive k are dispatched to the solver at once.
+    offset = max(max(abs(c) for c in cl) for cl in cnf)+1 
+    network, outputs, network_vars = totalizer_network(new_flip_var_ids, offset) if len(new_flip_var_ids) > 0 else ([], [], set())
+    exists = (all_var_ids - orig_var_ids) | network_vars
+    cnf = cnf + network
+    solver = get_pmc_solver()
+    batch = max(1, batch)
+
+    for k0 in range(0, len(outputs)+1, batch):
+        ks = range(k0, min(k0+batch, len(outputs)+1))
+        cnfs = [ cnf + [[-outputs[k]]] if k < len(outputs) else cnf for k in ks ]
+        if debug: print(f"k={ks[0]}..{ks[-1]} size of cnf: {len(cnf)+1}")
+        counts = solver.satcount_many(cnfs, exists=exists)
+        yield from zip(ks, counts)
+    # every assignment flips at most len(outputs) variables
+    for k in count(len(outputs)+1): yield k, counts[-1]
     
-def blame(f: Formula, x: str, rho=lambda x: 1/(x+1), cutoff = 0, modified=False, debug=False):
+def blame(f: Formula, x: str, rho=lambda x: 1/(x+1), cutoff = 0, modified=False, debug=False, batch=1):
     if x not in f.vars: return 0, 0
 
     if debug: print(f"=== COMPUTING BLAME for {x} in Formula with size {len(str(f))} ===")
@@ -43,7 +52,7 @@ def blame(f: Formula, x: str, rho=lambda x: 1/(x+1), cutoff = 0, modified=False,
     stopping_reason = "finished iteration."
     varcount = len(f.vars)
     last_ell_sc = 0
-    for k, ell_satcount in resp_counts(f, x, debug=debug, modified=modified):
+    for k, ell_satcount in resp_counts(f, x, debug=debug, modified=modified, batch=batch):
         if k == varcount: break
 
         # early stopping criteria
@@ -53,11 +53,11 @@ def at_most_cnf(k: int, X: set, start_idx: int) -> tuple[list[list[int]], set]:
     clauses += [ [-z(k,n-1)] ]
     return clauses, set(Z.values())
 
-def totalizer(k: int, X: set, start_idx: int) -> tuple[list[list[int]], set]:
+def totalizer_network(X: set, start_idx: int) -> tuple[list[list[int]], list[int], set]:
     # cf. https://www.researchgate.net/profile/Yacine-Boufkhad/publication/221633097_Efficient_CNF_Encoding_of_Boolean_Cardinality_Constraints/links/0c960529848a5cd3ba000000/Efficient-CNF-Encoding-of-Boolean-Cardinality-Constraints.pdf
-    assert k >= 0
-    if k >= len(X): return [], set()
-
+    # returns the clauses of the network, its outputs and the new variables.
+    # if more than i variables of X are true, then output i must be true.
+    assert len(X) > 0
     clauses = []
     queue = [ { 0: i } for i in X ]
     new_var_offset = start_idx
@@ -88,8 +88,15 @@ def totalizer(k: int, X: set, start_idx: int) -> tuple[list[list[int]], set]:
 
         queue.append( vars_top )
 
-    # cardinality constraint <= k:
     vars_top = queue[0]
-    clauses += [ [(-1)**(i>=k)*vars_top[i]] for i in range(len(X)) ]
-    return clauses, set(range(start_idx, new_var_offset))
+    return clauses, [ vars_top[i] for i in range(len(X)) ], set(range(start_idx, new_var_offset))
+
+def totalizer(k: int, X: set, start_idx: int) -> tuple[list[list[int]], set]:
+    assert k >= 0
+    if k >= len(X): return [], set()
+
+    clauses, outputs, new_vars = totalizer_network(X, start_idx)
+    # cardinality constraint <= k:
+    clauses += [ [(-1)**(i>=k)*outputs[i]] for i in range(len(X)) ]
+    return clauses, new_vars
 
@@ -1,5 +1,13 @@
 from typing import Callable, List, Set, Dict
 from .representation import PseudoBoolFunc
+from . import mapping
+
+# value functions for which the values of all variables can be computed at once
+ALL_AT_ONCE = {
+  mapping.banzhaf: mapping.banzhaf_all,
+  mapping.influence: mapping.influence_all,
+  mapping.shapley: mapping.shapley_all,
+}
 
 class Ranking:
   ranking : List[Set[str]]
@@ -27,8 +35,10 @@ class Ranking:
     return isinstance(other, Ranking) and other.ranking == self.ranking
 
 def ranking_from_val(eval : Callable[[PseudoBoolFunc,str], PseudoBoolFunc], f : PseudoBoolFunc, precision=1e-8) -> Ranking:
+  if eval in ALL_AT_ONCE: vals = ALL_AT_ONCE[eval](f)
+  else: vals = { x: eval(f,x) for x in f.vars }
   rank = sorted(
-    [ (x, eval(f,x)) for x in f.vars ], 
+    vals.items(), 
     key=lambda tpl: tpl[1])
   ordered_partition, curset, lastval = [], set(), None
   values = {}
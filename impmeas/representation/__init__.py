@@ -1,7 +1,11 @@
 from .repr import PseudoBoolFunc
-from .utils import cnf2dimacs, iter_assignments
-from .formula import Formula, set_pmc_solver, get_pmc_solver
+from .utils import cnf2dimacs, write_dimacs, read_dimacs, iter_assignments, assignment_matrix, iter_indices, var_weights, assignment2index, index2assignment, reindex, popcount
+from .counter import ModelCounter, DPLLCounter
+from .formula import Formula, set_pmc_solver, get_pmc_solver, get_default_counter, clear_formula_cache, set_formula_cache_size
 from .gpmc import GPMC
+from .cache import CountCache
 from .table import Table
+from .bittable import BitTable
+from .cnf import CNFFunction
 from .buddy import BuddyNode, add_buddy_delete_callback, buddy_initialize, swap_vars, set_dynamic_reordering, reorder, load, force_heuristic, random_order
 from .formula_parser import formula2tree
\ No newline at end of file
@@ -0,0 +1,203 @@
+from typing import Iterable, Union
+from .repr import PseudoBoolFunc
+from .table import Table
+import numpy as np
+
+WORD = np.dtype("<u8")
+
+# MASKS[p] selects the bits of a word whose index has a 0 at position p (for p < 6)
+MASKS = [ np.uint64(m) for m in [
+    0x5555555555555555,
+    0x3333333333333333,
+    0x0F0F0F0F0F0F0F0F,
+    0x00FF00FF00FF00FF,
+    0x0000FFFF0000FFFF,
+    0x00000000FFFFFFFF ] ]
+
+CHUNK = 1 << 20
+
+def _popcount(words: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"): return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(np.unpackbits(words.view(np.uint8)).sum(dtype=np.int64))
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    packed = np.packbits(np.asarray(bits, dtype=np.bool_), bitorder="little")
+    packed = np.concatenate([packed, np.zeros((-len(packed)) % 8, dtype=np.uint8)])
+    return packed.view(WORD)
+
+def _unpack(words: np.ndarray, n: int) -> np.ndarray:
+    return np.unpackbits(words.view(np.uint8), bitorder="little")[:2**n].astype(np.bool_)
+
+def _valid(n: int) -> np.uint64:
+    # mask of the bits that are used by a table over n variables (only relevant if n < 6)
+    return np.uint64((1 << 2**n) - 1) if n < 6 else ~np.uint64(0)
+
+class BitTable(PseudoBoolFunc):
+    MUST_ALWAYS_BE_BOOLEAN = True
+
+    def __init__(self, words: np.ndarray, vars: list[str], print_mode="primes"):
+        # entry idx of the table is stored in bit idx%64 of word idx//64; the
+        # last variable corresponds to the least significant bit of idx (cf. Table).
+        super().__init__()
+        self.__words = np.asarray(words, dtype=WORD).ravel()
+        self.__vars = vars
+        self.__print_mode = print_mode
+        assert max(1, 2**len(vars) // 64) == len(self.__words)
+
+    def set_print_mode(self, mode):
+        assert mode in ["table", "primes"]
+        self.__print_mode = mode
+
+    def __getitem__(self, key) -> bool:
+        idx = int(key) if isinstance(key, (int, np.integer)) else self.assignment2idx(key)
+        return bool((self.__words[idx >> 6] >> np.uint64(idx & 63)) & np.uint64(1))
+
+    def __hash__(self):
+        return hash(self.__words.tobytes()) + tuple(self.vars).__hash__()
+
+    def __copy__(self):
+        return BitTable(self.__words.copy(), self.vars.copy())
+
+    @property
+    def is_boolean(self):
+        return True
+
+    @property
+    def vars(self) -> Iterable[str]:
+        return self.__vars
+
+    @property
+    def words(self) -> np.ndarray:
+        return self.__words
+
+    def cofactor(self, ass: dict[str, bool]) -> "BitTable":
+        words, vars = self.__words, self.vars
+        for x in ass:
+            if x not in vars: continue
+            p = len(vars) - 1 - vars.index(x)
+            words = BitTable._select(words, p, len(vars), bool(ass[x]))
+            vars = [y for y in vars if y != x]
+        return BitTable(words, vars)
+
+    def flip(self, S: Union[str, set[str]]) -> "BitTable":
+        if isinstance(S,str): S = {S}
+        words, n = self.__words, len(self.vars)
+        for p in (n-1-idx for idx, x in enumerate(self.vars) if x in S):
+            if p >= 6:
+                words = words.reshape(-1, 2, 2**(p-6))[:, ::-1, :].ravel()
+            else:
+                s = np.uint64(2**p)
+                words = ((words >> s) & MASKS[p]) | ((words & MASKS[p]) << s)
+        return BitTable(words.copy(), self.vars.copy())
+
+    @classmethod
+    @property
+    def false(cls) -> "BitTable":
+        return BitTable(np.zeros(1, dtype=WORD), [])
+
+    @classmethod
+    @property
+    def true(cls) -> "BitTable":
+        return BitTable(np.ones(1, dtype=WORD), [])
+
+    @classmethod
+    def _apply(cls, op: str, *children) -> "BitTable":
+        assert all( isinstance(c,BitTable) or c in [0,1] for c in children ), "only Boolean operations are supported"
+        all_vars = []
+        for c in children:
+            if isinstance(c, BitTable): all_vars += [x for x in c.vars if x not in all_vars]
+        n = len(all_vars)
+        vals = [ BitTable._aligned(c, all_vars) for c in children ]
+        mask = _valid(n)
+        if op == "~": val = ~vals[0] & mask
+        elif op == "&": val = vals[0] & vals[1]
+        elif op == "|": val = vals[0] | vals[1]
+        elif op == "^": val = vals[0] ^ vals[1]
+        elif op == "->": val = (~vals[0] | vals[1]) & mask
+        elif op == "<-": val = (vals[0] | ~vals[1]) & mask
+        elif op == "<->": val = ~(vals[0] ^ vals[1]) & mask
+        else: raise Exception(f"operation {op} not applicable to bit-packed tables.")
+        return BitTable(val, all_vars)
+
+    @classmethod
+    def var(cls, x: str) -> "BitTable":
+        return BitTable(np.array([0b10], dtype=WORD), [x])
+
+    def expectation(self) -> float:
+        return _popcount(self.__words) / 2**len(self.vars)
+
+    ## END ABSTRACT METHODS
+    ## THE FOLLOWING IS OVERWRITTEN:
+
+    def boolean_derivative(self, x: str) -> "BitTable":
+        f0, f1 = self.branch(x)
+        return BitTable(f0.words ^ f1.words, f0.vars)
+
+    def __eq__(self, other):
+        if isinstance(other, BitTable):
+            all_vars = self.vars + [x for x in other.vars if x not in self.vars]
+            return bool(np.array_equal(self._aligned(self, all_vars), self._aligned(other, all_vars)))
+        return super().__eq__(other)
+
+    def __ne__(self, other): return not self.__eq__(other)
+    def equivalent(self, other): return self.__eq__(other)
+
+    # --- END ABSTRACT METHODS ---
+
+    def replace(self, d: dict[str, str]):
+        cpy_vars = [d.get(x, x) for x in self.vars]
+        assert len(self.vars) == len(set(cpy_vars)), "renaming must be a bijection!"
+        return BitTable(self.__words, cpy_vars)
+
+    def _minterms(self) -> list[int]:
+        return np.flatnonzero(_unpack(self.__words, len(self.vars))).tolist()
+
+    def assignment2idx(self, assignment: dict[str, bool]) -> int:
+        n = len(self.vars)
+        return sum(1 << (n-1-idx) for idx, x in enumerate(self.vars) if assignment[x])
+
+    @classmethod
+    def from_table(cls, table: Table) -> "BitTable":
+        assert table.is_boolean
+        return BitTable(_pack(table.array), table.vars.copy())
+
+    def to_table(self) -> Table:
+        return Table(_unpack(self.__words, len(self.vars)), self.vars.copy())
+
+    @staticmethod
+    def _select(words: np.ndarray, p: int, n: int, c: bool) -> np.ndarray:
+        # removes the variable at bit position p of the index by keeping the half where it equals c
+        if p >= 6:
+            return words.reshape(-1, 2, 2**(p-6))[:, int(c), :].ravel().copy()
+        w = (words >> np.uint64(2**p)) if c else words
+        w = w & MASKS[p]
+        for j in range(p, 5):
+            w = (w | (w >> np.uint64(2**j))) & MASKS[j+1]
+        # every word now holds 32 entries in its lower half
+        if n-1 < 6: return w[:1]
+        return w[0::2] | (w[1::2] << np.uint64(32))
+
+    @staticmethod
+    def _aligned(f: Union["BitTable", int], vars: list[str]) -> np.ndarray:
+        # returns the words of f over vars (which must contain f's variables)
+        n = len(vars)
+        if not isinstance(f, BitTable):
+            return np.full(max(1, 2**n // 64), _valid(n) if f else 0, dtype=WORD)
+        if f.vars == vars: return f.words
+        m = len(f.vars)
+        positions = [ (n-1-vars.index(x), m-1-j) for j, x in enumerate(f.vars) ]
+        out = np.empty(max(1, 2**n // 64), dtype=WORD)
+        # gather the entries in chunks to keep the memory overhead bounded
+        for start in range(0, 2**n, CHUNK):
+            rows = np.arange(start, min(start+CHUNK, 2**n), dtype=np.int64)
+            idx = np.zeros(len(rows), dtype=np.int64)
+            for pn, pm in positions: idx |= ((rows >> pn) & 1) << pm
+            bits = (f.words[idx >> 6] >> (idx & 63).astype(WORD)) & np.uint64(1)
+            packed = _pack(bits)
+            out[start//64:start//64+len(packed)] = packed
+        return out
+
+    def __repr__(self):
+        table = self.to_table()
+        table.set_print_mode(self.__print_mode)
+        return repr(table)
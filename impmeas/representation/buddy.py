@@ -1,10 +1,13 @@
 from collections import defaultdict
+from contextlib import contextmanager
 import math
 import os
 from ctypes import CDLL, c_double, c_int, c_char_p, byref, POINTER, cdll
 from typing import Tuple, Union
+import numpy as np
 
 from .repr import PseudoBoolFunc
+from .table import Table
 
 
 class BuddyNode(PseudoBoolFunc):
@@ -60,6 +63,34 @@ class BuddyNode(PseudoBoolFunc):
 			g = BuddyNode.var(x).ite(f0, f1)
 		return g
 
+	def flip_closure(self, S:Union[str,set[str]]) -> "BuddyNode":
+		# computes self | self.flip(y) for all y in S in a single bottom-up pass over the nodes: 
+		# if y is the variable of a node, flipping it swaps the children, otherwise it is flipped below.
+		# works on raw node ids; intermediate results are referenced until the pass is done and
+		# dynamic reordering is suspended, since a reorder would invalidate the node snapshot.
+		if isinstance(S,str): S = {S}
+		with _suspended_reordering():
+			return self.__flip_closure(S)
+
+	def __flip_closure(self, S: set[str]) -> "BuddyNode":
+		nodes = self.iter_nodes()
+		closures = { 0: 0, 1: 1 }
+		try:
+			for node_id, x, low, high in reversed(nodes):
+				var = BUDDY_OBJ.bdd_ithvar(VAR_NAME2LEVEL[x])
+				if x in S:
+					high_tf = BUDDY_OBJ.bdd_addref(BUDDY_OBJ.bdd_or(closures[high], low))
+					low_tf = BUDDY_OBJ.bdd_addref(BUDDY_OBJ.bdd_or(closures[low], high))
+					closures[node_id] = BUDDY_OBJ.bdd_addref(BUDDY_OBJ.bdd_ite(var, high_tf, low_tf))
+					BUDDY_OBJ.bdd_delref(high_tf)
+					BUDDY_OBJ.bdd_delref(low_tf)
+				else:
+					closures[node_id] = BUDDY_OBJ.bdd_addref(BUDDY_OBJ.bdd_ite(var, closures[high], closures[low]))
+			return BuddyNode(closures[self.node_id])
+		finally:
+			for node_id, _, _, _ in nodes:
+				if node_id in closures: BUDDY_OBJ.bdd_delref(closures[node_id])
+
 	@classmethod
 	@property
 	def false(cls) -> "BuddyNode": 
@@ -96,8 +127,10 @@ class BuddyNode(PseudoBoolFunc):
 	## END ABSTRACT METHODS
 	## OVERWRITTEN:
 
-	def expectation(self) -> float: 
-		return float(BUDDY_OBJ.bdd_satcount(self.node_id)) / 2**len(VARS)
+	def expectation(self, p: dict[str, float] = None) -> float: 
+		# if p is given, every variable x is true with probability p[x] (default 1/2)
+		if p is None: return float(BUDDY_OBJ.bdd_satcount(self.node_id)) / 2**len(VARS)
+		return self.probabilities(p)[self.node_id]
 
 	def __le__(self, other):
 		raise NotImplementedError()
@@ -151,6 +184,73 @@ class BuddyNode(PseudoBoolFunc):
 			with open(filename+"v", "w") as f:
 				f.write("\n".join(VARS))
 	
+	def iter_nodes(self) -> list[tuple[int, str, int, int]]:
+		# returns (node id, variable, low id, high id) for every inner node of this BDD, ordered by level.
+		# The snapshot is only valid until the next BDD operation, which may reorder the variables
+		# (if dynamic reordering is enabled); passes that create nodes use _suspended_reordering.
+		nodes, stack, seen = [], [self.node_id], {0, 1}
+		while len(stack) > 0:
+			node_id = stack.pop()
+			if node_id in seen: continue
+			seen.add(node_id)
+			low, high = BUDDY_OBJ.bdd_low(node_id), BUDDY_OBJ.bdd_high(node_id)
+			nodes.append((node_id, BUDDY_OBJ.bdd_var(node_id), low, high))
+			stack += [low, high]
+		nodes.sort(key=lambda node: BUDDY_OBJ.bdd_var2level(node[1]))
+		return [ (node_id, VARS[var], low, high) for node_id, var, low, high in nodes ]
+
+	def probabilities(self, p: dict[str, float] = {}) -> dict[int, float]:
+		# returns, for every node id of this BDD, the probability that the node evaluates to true
+		# if every variable x is true with probability p[x] (default 1/2). Skipped levels do not
+		# change the probability, so a single bottom-up pass suffices.
+		prob = { 0: 0.0, 1: 1.0 }
+		for node_id, x, low, high in reversed(self.iter_nodes()):
+			px = p.get(x, 0.5)
+			prob[node_id] = (1-px)*prob[low] + px*prob[high]
+		return prob
+
+	def _weight_polynomials(self, X: list[str], nodes: list[tuple[int, str, int, int]] = None, dtype=object) -> tuple[dict, list, dict]:
+		# X are variables ordered by level that contain the support of this BDD. Returns the rank of every
+		# node (the position of its variable in X, len(X) for terminals), binom (binom[g] counts the assignments
+		# to g skipped variables by their number of true variables) and below (below[node] counts the
+		# satisfying assignments to the variables of X after the node's variable by their number of true variables)
+		nodes = self.iter_nodes() if nodes is None else nodes
+		n, position = len(X), { x: i for i, x in enumerate(X) }
+		rank = { 0: n, 1: n }
+		rank.update({ node_id: position[x] for node_id, x, _, _ in nodes })
+		binom = [ np.array([ math.comb(g,j) for j in range(g+1) ], dtype=dtype) for g in range(n+1) ]
+		below = { 0: np.zeros(1, dtype=dtype), 1: np.ones(1, dtype=dtype) }
+		for node_id, _, low, high in reversed(nodes):
+			lowpoly = np.convolve(binom[rank[low] - rank[node_id] - 1], below[low])
+			highpoly = np.convolve(binom[rank[high] - rank[node_id] - 1], below[high])
+			below[node_id] = np.concatenate([lowpoly, [0]]) + np.concatenate([[0], highpoly])
+		return rank, binom, below
+
+	def satcount_by_weight(self, vars: list[str] = None) -> list[int]:
+		# returns c such that c[k] is the number of satisfying assignments over vars (default: all
+		# variables) with exactly k true variables
+		vars = VARS if vars is None else vars
+		assert self.vars <= set(vars), "vars must contain the variables of this function"
+		X = sorted(vars, key=lambda x: BUDDY_OBJ.bdd_var2level(VAR_NAME2LEVEL[x]))
+		rank, binom, below = self._weight_polynomials(X)
+		counts = np.convolve(binom[rank[self.node_id]], below[self.node_id])
+		return [ int(c) for c in counts ] + [0]*(len(X)+1-len(counts))
+
+	def to_table(self) -> Table:
+		# truth table over the support of this BDD (ordered by level), built bottom-up per node
+		X = sorted(self.vars, key=lambda x: BUDDY_OBJ.bdd_var2level(VAR_NAME2LEVEL[x]))
+		n, position = len(X), { x: i for i, x in enumerate(X) }
+		rank = { 0: n, 1: n }
+		nodes = self.iter_nodes()
+		rank.update({ node_id: position[x] for node_id, x, _, _ in nodes })
+		# the variables skipped between a node and its child are more significant, so the table of the child is repeated
+		expand = lambda child, r: np.tile(tables[child], 2**(rank[child]-r))
+		tables = { 0: np.zeros(1, dtype=np.bool_), 1: np.ones(1, dtype=np.bool_) }
+		for node_id, _, low, high in reversed(nodes):
+			r = rank[node_id]
+			tables[node_id] = np.concatenate([expand(low, r+1), expand(high, r+1)])
+		return Table(expand(self.node_id, 0), X)
+
 	@property 
 	def level(self):
 		if self.node_id in [0,1]: return len(VARS)
@@ -160,11 +260,12 @@ class BuddyNode(PseudoBoolFunc):
 BUDDY_OBJ = None
 VARS = None
 VAR_NAME2LEVEL = None
+DYNAMIC_REORDERING = False
 on_delete_cbs = []
 BUDDY_OBJ_INSTANCE_COUNTER = 0
 
 def buddy_initialize(vars: list[str], lib:str ="/usr/local/lib/libbdd.so", nodenum=1<<20, cachesize=1<<15) -> None: 
-	global BUDDY_OBJ, VARS, VAR_NAME2LEVEL, on_delete_cbs, BUDDY_OBJ_INSTANCE_COUNTER
+	global BUDDY_OBJ, VARS, VAR_NAME2LEVEL, DYNAMIC_REORDERING, on_delete_cbs, BUDDY_OBJ_INSTANCE_COUNTER
 
 	if BUDDY_OBJ is not None:
 		for cb in on_delete_cbs: cb()
@@ -173,6 +274,7 @@ def buddy_initialize(vars: list[str], lib:str ="/usr/local/lib/libbdd.so", noden
 
 	VARS = tuple(vars)
 	VAR_NAME2LEVEL = { x : k for k, x in enumerate(vars) }
+	DYNAMIC_REORDERING = False
 
 	BUDDY_OBJ = CDLL(lib)
 	BUDDY_OBJ.bdd_init(nodenum, cachesize)
@@ -196,12 +298,26 @@ def swap_vars(v1, v2):
 	BUDDY_OBJ.bdd_printorder()
 
 def set_dynamic_reordering(type=True):
+	global DYNAMIC_REORDERING
+	DYNAMIC_REORDERING = bool(type)
 	if type:
 		BUDDY_OBJ.bdd_autoreorder(3) # sifting as standard reordering
 		BUDDY_OBJ.bdd_enable_reorder()
 	else:
 		BUDDY_OBJ.bdd_disable_reorder()
 
+@contextmanager
+def _suspended_reordering():
+	# disables dynamic reordering while node ids and levels of a snapshot are in use
+	if not DYNAMIC_REORDERING:
+		yield
+		return
+	BUDDY_OBJ.bdd_disable_reorder()
+	try:
+		yield
+	finally:
+		BUDDY_OBJ.bdd_enable_reorder()
+
 def reorder(method=3):
 	rnames = {
 		1:"WIN2", 
@@ -0,0 +1,73 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+class CountCache:
+    def __init__(self, maxsize=4096, filename=None):
+        # model counts are stored in an in-memory LRU tier with at most maxsize entries and,
+        # if filename is given, in an SQLite database that persists across runs
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__db = None
+        if filename is not None:
+            self.__db = sqlite3.connect(filename, check_same_thread=False)
+            self.__db.execute("CREATE TABLE IF NOT EXISTS counts (key TEXT PRIMARY KEY, count TEXT)")
+            self.__db.commit()
+        self.hits, self.disk_hits, self.misses = 0, 0, 0
+
+    @staticmethod
+    def key(cnf: list[list[int]], nr_vars: int, projected: set[int]) -> str:
+        # canonical hash: the order of clauses and of literals within clauses is irrelevant
+        clauses = sorted({ tuple(sorted(set(cl))) for cl in cnf })
+        h = hashlib.sha256(f"{nr_vars};{sorted(projected)};".encode())
+        for cl in clauses: h.update((" ".join(map(str, cl)) + " 0\n").encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[int]:
+        with self.__lock:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return self.__entries[key]
+            if self.__db is not None:
+                row = self.__db.execute("SELECT count FROM counts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    self.__store(key, int(row[0]))
+                    return int(row[0])
+            self.misses += 1
+            return None
+
+    def put(self, key: str, count: int):
+        with self.__lock:
+            self.__store(key, count)
+            if self.__db is not None:
+                self.__db.execute("INSERT OR REPLACE INTO counts VALUES (?, ?)", (key, str(count)))
+                self.__db.commit()
+
+    def __store(self, key: str, count: int):
+        self.__entries[key] = count
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__maxsize:
+            self.__entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return { "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "size": len(self) }
+
+    def clear(self):
+        # clears the in-memory tier and the statistics (the persistent tier is kept)
+        with self.__lock:
+            self.__entries.clear()
+            self.hits, self.disk_hits, self.misses = 0, 0, 0
+
+    def close(self):
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
@@ -0,0 +1,244 @@
+from typing import Iterable, Union
+from .repr import PseudoBoolFunc
+from .formula import get_pmc_solver, get_default_counter
+from .counter import _satisfiable
+
+class CNFFunction(PseudoBoolFunc):
+    MUST_ALWAYS_BE_BOOLEAN = True
+
+    def __init__(self, clauses: list[list[int]], names: list[str], nr_aux: int = 0):
+        # variable i (1 <= i <= len(names)) is names[i-1]; the variables len(names)+1, ...,
+        # len(names)+nr_aux are auxiliary and existentially quantified.
+        # An empty clause is unsatisfiable.
+        super().__init__()
+        self.__clauses = [ list(cl) for cl in clauses ]
+        self.__names = list(names)
+        self.__nr_aux = nr_aux
+        assert all(0 < abs(lit) <= len(names) + nr_aux for cl in self.__clauses for lit in cl)
+
+    # --- ABSTRACT METHODS ---
+
+    def __getitem__(self, assignment: dict[str, bool]) -> bool:
+        g = self.cofactor({ x: assignment[x] for x in self.__names })
+        if g.nr_aux == 0: return len(g.clauses) == 0
+        return _satisfiable(g.clauses)
+
+    def __hash__(self):
+        return (tuple(tuple(cl) for cl in self.__clauses), tuple(self.__names), self.__nr_aux).__hash__()
+
+    def __copy__(self):
+        return CNFFunction(self.__clauses, self.__names, self.__nr_aux)
+
+    @property
+    def is_boolean(self):
+        return True
+
+    @property
+    def vars(self) -> Iterable[str]:
+        return self.__names
+
+    def cofactor(self, ass: dict[str, bool]) -> "CNFFunction":
+        # deletes satisfied clauses and falsified literals, followed by unit propagation
+        lits = { idx+1: ass[x] for idx, x in enumerate(self.__names) if x in ass }
+        clauses = []
+        for cl in self.__clauses:
+            if any(abs(lit) in lits and lits[abs(lit)] == (lit > 0) for lit in cl): continue
+            clauses.append([ lit for lit in cl if abs(lit) not in lits ])
+        names = [ x for x in self.__names if x not in ass ]
+        clauses = CNFFunction._propagate(clauses)
+        if clauses is None: return CNFFunction([[]], names)
+        return CNFFunction(CNFFunction._relabel(clauses, self.__names, names, len(names), self.__nr_aux), names, self.__nr_aux)
+
+    def flip(self, S: Union[str, set[str]]) -> "CNFFunction":
+        if isinstance(S,str): S = {S}
+        ids = { idx+1 for idx, x in enumerate(self.__names) if x in S }
+        clauses = [ [ -lit if abs(lit) in ids else lit for lit in cl ] for cl in self.__clauses ]
+        return CNFFunction(clauses, self.__names, self.__nr_aux)
+
+    @classmethod
+    @property
+    def false(cls) -> "CNFFunction":
+        return CNFFunction([[]], [])
+
+    @classmethod
+    @property
+    def true(cls) -> "CNFFunction":
+        return CNFFunction([], [])
+
+    @classmethod
+    def _apply(cls, op: str, *children) -> "CNFFunction":
+        assert all( isinstance(c,CNFFunction) or c in [0,1] for c in children ), "only Boolean operations are supported"
+        children = [ c if isinstance(c,CNFFunction) else (CNFFunction.true if c else CNFFunction.false) for c in children ]
+        if op == "&": return CNFFunction._combine(children[0], children[1], selector=False)
+        elif op == "|": return CNFFunction._combine(children[0], children[1], selector=True)
+        elif op == "~": return CNFFunction._negate(children[0])
+        elif op == "^": return (children[0] | children[1]) & ~(children[0] & children[1])
+        elif op == "->": return ~children[0] | children[1]
+        elif op == "<-": return children[0] | ~children[1]
+        elif op == "<->": return (~children[0] | children[1]) & (children[0] | ~children[1])
+        raise Exception(f"operation {op} not applicable to CNFs.")
+
+    @classmethod
+    def var(cls, x: str) -> "CNFFunction":
+        return CNFFunction([[1]], [x])
+
+    ## END ABSTRACT METHODS
+    ## THE FOLLOWING IS OVERWRITTEN:
+
+    def expectation(self) -> float:
+        if any(len(cl) == 0 for cl in self.__clauses): return 0
+        if len(self.__clauses) == 0: return 1
+        if len(self.__names) == 0: return float(_satisfiable(self.__clauses))
+        solver = get_pmc_solver() or get_default_counter()
+        # the clauses are sent to the solver directly; auxiliary variables are projected away
+        nr_vars = max(abs(lit) for cl in self.__clauses for lit in cl)
+        aux = set(range(len(self.__names)+1, nr_vars+1))
+        sc = solver.satcount(self.__clauses, exists=aux)
+        return sc / 2**min(nr_vars, len(self.__names))
+
+    def boolean_derivative(self, x: str) -> "CNFFunction":
+        # f[x/0] ^ f[x/1] = C & (A0 ^ A1), where C are the clauses without x (shared by both cofactors)
+        # and A0, A1 are the cofactors of the clauses with x. A0 and A1 are defined by auxiliary
+        # variables t0, t1 (Tseitin) and the xor by the selector pair (t0 | t1) & (~t0 | ~t1).
+        # Auxiliary variables in clauses with x are eliminated before, since they cannot be shared.
+        assert x in self.__names
+        ix = self.__names.index(x)+1
+        f = self
+        while True:
+            touching = { abs(lit) for cl in f.clauses if ix in map(abs, cl) for lit in cl if abs(lit) > len(f.vars) }
+            if len(touching) == 0: break
+            f = CNFFunction._eliminate_aux(f, touching)
+        names = [ y for y in self.__names if y != x ]
+        shared = [ cl for cl in f.clauses if ix not in map(abs, cl) ]
+        # A[0] (A[1]) consists of the clauses that are not satisfied by x = 0 (x = 1)
+        A = [ [ [ lit for lit in cl if abs(lit) != ix ] for cl in f.clauses if lit_x in cl and -lit_x not in cl ] for lit_x in [ix, -ix] ]
+        if sorted(map(sorted, A[0])) == sorted(map(sorted, A[1])): return CNFFunction([[]], names)
+        clauses = CNFFunction._relabel(shared, f.vars, names, len(names), f.nr_aux)
+        A = [ CNFFunction._relabel(Ab, f.vars, names, len(names), 0) for Ab in A ]
+        top, ts = len(names) + f.nr_aux, []
+        for Ab in A:
+            # t <-> (d_1 & ... & d_m), where d_i <-> C_i (or the literal itself for unit clauses)
+            ds = []
+            for cl in Ab:
+                if len(cl) == 1:
+                    ds.append(cl[0])
+                    continue
+                top += 1
+                ds.append(top)
+                clauses += [ [-top] + cl ] + [ [top, -lit] for lit in cl ]
+            top += 1
+            ts.append(top)
+            clauses += [ [-top, d] for d in ds ] + [ [top] + [ -d for d in ds ] ]
+        clauses += [ [ts[0], ts[1]], [-ts[0], -ts[1]] ]
+        return CNFFunction(clauses, names, top - len(names))
+
+    def __eq__(self, other) -> bool: # structural equality!
+        if not isinstance(other, CNFFunction):
+            raise NotImplementedError()
+        return self.__names == other.vars and self.__nr_aux == other.nr_aux and self.__clauses == other.clauses
+
+    def __ne__(self, other) -> bool:
+        return not self.__eq__(other)
+
+    def equivalent(self, other):
+        if not isinstance(other, CNFFunction):
+            raise NotImplementedError()
+        if self.__nr_aux == 0 and other.nr_aux == 0:
+            return (self ^ other).expectation() == 0
+        return PseudoBoolFunc.__eq__(self, other)
+
+    # --- END ABSTRACT METHODS ---
+
+    @property
+    def clauses(self) -> list[list[int]]:
+        return self.__clauses
+
+    @property
+    def nr_aux(self) -> int:
+        return self.__nr_aux
+
+    def replace(self, d: dict[str, str]):
+        names = [ d.get(x, x) for x in self.__names ]
+        assert len(names) == len(set(names)), "renaming must be a bijection!"
+        return CNFFunction(self.__clauses, names, self.__nr_aux)
+
+    @classmethod
+    def from_clauses(cls, clauses: list[list[int]], nvars: int = None) -> "CNFFunction":
+        # variable i is called x{i} (cf. parse_dimacs)
+        if nvars is None: nvars = max((abs(lit) for cl in clauses for lit in cl), default=0)
+        return CNFFunction(clauses, [ f"x{i}" for i in range(1, nvars+1) ])
+
+    @staticmethod
+    def _relabel(clauses: list[list[int]], old: list[str], new: list[str], aux_offset: int, nr_aux: int) -> list[list[int]]:
+        # maps the named variables of old to their position in new and moves the auxiliary variables behind aux_offset
+        position = { x: idx+1 for idx, x in enumerate(new) }
+        ids = { idx+1: position[x] for idx, x in enumerate(old) if x in position }
+        ids.update({ len(old)+j: aux_offset+j for j in range(1, nr_aux+1) })
+        return [ [ ids[lit] if lit > 0 else -ids[-lit] for lit in cl ] for cl in clauses ]
+
+    @staticmethod
+    def _combine(f: "CNFFunction", g: "CNFFunction", selector: bool) -> "CNFFunction":
+        # conjunction of f and g; for the disjunction, an auxiliary selector s is added (s -> f, ~s -> g)
+        names = f.vars + [ x for x in g.vars if x not in f.vars ]
+        n = len(names)
+        f_clauses = CNFFunction._relabel(f.clauses, f.vars, names, n, f.nr_aux)
+        g_clauses = CNFFunction._relabel(g.clauses, g.vars, names, n+f.nr_aux, g.nr_aux)
+        nr_aux = f.nr_aux + g.nr_aux
+        if not selector: return CNFFunction(f_clauses + g_clauses, names, nr_aux)
+        if nr_aux == 0 and len(f_clauses)*len(g_clauses) <= len(f_clauses)+len(g_clauses):
+            # distributing the disjunction over the clauses is not larger than using a selector
+            return CNFFunction([ fc + [ lit for lit in gc if lit not in fc ] for fc in f_clauses for gc in g_clauses ], names)
+        s = n + nr_aux + 1
+        clauses = [ [-s] + cl for cl in f_clauses ] + [ [s] + cl for cl in g_clauses ]
+        return CNFFunction(clauses, names, nr_aux+1)
+
+    @staticmethod
+    def _negate(f: "CNFFunction") -> "CNFFunction":
+        # ~(C_1 & ... & C_m) = a_1 | ... | a_m where a_i implies that every literal of C_i is false
+        if f.nr_aux > 0: f = CNFFunction._eliminate_aux(f)
+        n, m = len(f.vars), len(f.clauses)
+        clauses = [ [ n+i+1 for i in range(m) ] ]
+        for i, cl in enumerate(f.clauses):
+            clauses += [ [-(n+i+1), -lit] for lit in cl ]
+        return CNFFunction(clauses, f.vars, m)
+
+    @staticmethod
+    def _eliminate_aux(f: "CNFFunction", aux: set[int] = None) -> "CNFFunction":
+        # removes the auxiliary variables aux (default: all) by resolution (Davis-Putnam), which may increase
+        # the number of clauses. The remaining auxiliary variables are renumbered.
+        n, clauses = len(f.vars), [ frozenset(cl) for cl in f.clauses ]
+        aux = set(range(n+1, n+f.nr_aux+1)) if aux is None else aux
+        for a in sorted(aux):
+            pos = [ cl for cl in clauses if a in cl ]
+            neg = [ cl for cl in clauses if -a in cl ]
+            clauses = [ cl for cl in clauses if a not in cl and -a not in cl ]
+            resolvents = { (p - {a}) | (q - {-a}) for p in pos for q in neg }
+            clauses += [ r for r in resolvents if not any(-lit in r for lit in r) ]
+        ids = { a: n+j+1 for j, a in enumerate(a for a in range(n+1, n+f.nr_aux+1) if a not in aux) }
+        relabel = lambda lit: lit if abs(lit) <= n else (ids[lit] if lit > 0 else -ids[-lit])
+        return CNFFunction([ [ relabel(lit) for lit in sorted(cl, key=abs) ] for cl in dict.fromkeys(clauses) ], f.vars, len(ids))
+
+    @staticmethod
+    def _propagate(clauses: list[list[int]]) -> list[list[int]]:
+        # unit propagation: the unit clauses are kept, other clauses containing a unit literal are deleted and
+        # negated unit literals are removed. Returns None if a clause becomes empty.
+        units = set()
+        while True:
+            if any(len(cl) == 0 for cl in clauses): return None
+            new = { cl[0] for cl in clauses if len(cl) == 1 } - units
+            if len(new) == 0: return clauses
+            units |= new
+            if any(-lit in units for lit in units): return None
+            kept, seen = [], set()
+            for cl in clauses:
+                if len(cl) == 1 and cl[0] in units:
+                    if cl[0] not in seen: kept.append(cl)
+                    seen.add(cl[0])
+                elif not any(lit in units for lit in cl):
+                    kept.append([ lit for lit in cl if -lit not in units ])
+            clauses = kept
+
+    def __repr__(self):
+        name = lambda v: self.__names[v-1] if v <= len(self.__names) else f"_a{v-len(self.__names)}"
+        if len(self.__clauses) == 0: return "1"
+        return " & ".join( "(" + " | ".join(("~" if lit < 0 else "") + name(abs(lit)) for lit in cl) + ")" for cl in self.__clauses )
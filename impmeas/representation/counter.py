@@ -0,0 +1,217 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Union
+from .cache import CountCache
+import numpy as np
+
+def _propagate(clauses: set[frozenset]) -> tuple[set[frozenset], set[int]]:
+    # unit propagation, where all current unit literals are assigned in one pass over the clauses.
+    # Returns the remaining clauses (None on a conflict) and the assigned variables.
+    assigned = set()
+    while True:
+        if frozenset() in clauses: return None, assigned
+        units = { next(iter(cl)) for cl in clauses if len(cl) == 1 }
+        if len(units) == 0: return clauses, assigned
+        if any(-lit in units for lit in units): return None, assigned
+        assigned |= { abs(lit) for lit in units }
+        negated = frozenset(-lit for lit in units)
+        clauses = { cl if cl.isdisjoint(negated) else cl - negated for cl in clauses if cl.isdisjoint(units) }
+
+def _satisfiable(clauses: list[list[int]]) -> bool:
+    # small DPLL procedure with unit propagation
+    clauses, _ = _propagate({ frozenset(cl) for cl in clauses })
+    if clauses is None: return False
+    if len(clauses) == 0: return True
+    lit = next(iter(min(clauses, key=len)))
+    return _satisfiable(clauses | { frozenset([lit]) }) or _satisfiable(clauses | { frozenset([-lit]) })
+
+class ModelCounter(ABC):
+    # interface of (projected) model counters: satcount(cnf, exists=E) counts the assignments to the
+    # variables 1, ..., n (where n is the largest variable of cnf) except those in E, which can be
+    # extended to a model of cnf. Counts are cached in an in-memory CountCache by default (pass
+    # cache=False to disable caching), and batches are counted by up to `workers` threads.
+    def __init__(self, workers: int = 1, cache: CountCache = None):
+        self.__workers = workers
+        self.__pool = None
+        self.__cache = CountCache() if cache is None else (None if cache is False else cache)
+
+    @property
+    def workers(self) -> int:
+        return self.__workers
+
+    @property
+    def cache(self) -> CountCache:
+        return self.__cache
+
+    @property
+    def capabilities(self) -> set[str]:
+        # "projection": supports exists, "batch": satcount_many, "parallel": counts of a batch run concurrently,
+        # "in_process": counts without spawning processes or writing files
+        return { "projection", "batch" } | ({ "parallel" } if self.__workers > 1 else set())
+
+    @abstractmethod
+    def _satcount(self, cnf: list[list[int]], nr_vars: int, projected: set[int], debug=False) -> int:
+        raise NotImplementedError()
+
+    def satcount(self, cnf: list[list[int]], \
+                 debug=False, exists=set()) -> int:
+        nr_vars = max((abs(lit) for cl in cnf for lit in cl), default=0)
+        projected = set(range(1, nr_vars+1)) - exists
+        if self.__cache is not None:
+            key = CountCache.key(cnf, nr_vars, projected)
+            value = self.__cache.get(key)
+            if value is None:
+                value = self._satcount(cnf, nr_vars, projected, debug=debug)
+                if value is not None: self.__cache.put(key, value)
+            return value
+        return self._satcount(cnf, nr_vars, projected, debug=debug)
+
+    def satcount_many(self, cnfs: Iterable[list[list[int]]], \
+                      debug=False, exists: Union[set, list[set]]=set()) -> list[int]:
+        # counts independent CNFs concurrently. exists is either shared by all CNFs or given per CNF.
+        cnfs = list(cnfs)
+        if isinstance(exists, (set, frozenset)): exists = [exists]*len(cnfs)
+        assert len(exists) == len(cnfs)
+        if self.__workers <= 1 or len(cnfs) <= 1:
+            return [ self.satcount(cnf, debug=debug, exists=ex) for cnf, ex in zip(cnfs, exists) ]
+        if self.__pool is None:
+            self.__pool = ThreadPoolExecutor(max_workers=self.__workers)
+        return list(self.__pool.map(lambda job: self.satcount(job[0], debug=debug, exists=job[1]), zip(cnfs, exists)))
+
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+class DPLLCounter(ModelCounter):
+    def __init__(self, cache: CountCache = None, component_cache_size: int = 1 << 16, enumeration_limit: int = 12):
+        # exact in-process counter: DPLL with unit propagation, decomposition into connected
+        # components and a cache of component counts (shared by all counts of this counter).
+        # Only projected variables are branched on; a component without projected variables
+        # is only checked for satisfiability. CNFs over at most enumeration_limit variables
+        # are counted by evaluating them on all assignments at once.
+        super().__init__(workers=1, cache=cache)
+        self.__components = {}
+        self.__component_cache_size = component_cache_size
+        self.__enumeration_limit = enumeration_limit
+
+    @property
+    def capabilities(self) -> set[str]:
+        return super().capabilities | { "in_process" }
+
+    def _satcount(self, cnf: list[list[int]], nr_vars: int, projected: set[int], debug=False) -> int:
+        clauses = set()
+        for cl in cnf:
+            cl = frozenset(cl)
+            if not any(-lit in cl for lit in cl): clauses.add(cl) # tautologies are dropped
+        projected = frozenset(projected)
+        if nr_vars <= self.__enumeration_limit:
+            count = DPLLCounter._enumerate(clauses, nr_vars, projected)
+            if debug: print(f"c s exact arb int {count}")
+            return count
+        # existentially quantified variables are eliminated where this does not increase the CNF
+        clauses = DPLLCounter._eliminate(clauses, { abs(lit) for cl in clauses for lit in cl } - projected)
+        # projected variables that do not occur in any clause are free
+        occurring = { abs(lit) for cl in clauses for lit in cl }
+        count = self.__count(frozenset(clauses), projected) * 2**len(projected - occurring)
+        if debug: print(f"c s exact arb int {count}")
+        return count
+
+    @staticmethod
+    def _enumerate(clauses: set[frozenset], nr_vars: int, projected: frozenset) -> int:
+        # the variables that are not projected are the least significant bits of the assignments,
+        # so the assignments that only differ in them form the rows of a matrix
+        order = sorted(projected) + [ v for v in range(1, nr_vars+1) if v not in projected ]
+        bit = { v: nr_vars-1-i for i, v in enumerate(order) }
+        idx = np.arange(2**nr_vars, dtype=np.int64)
+        sat = np.ones(len(idx), dtype=np.bool_)
+        for cl in clauses:
+            val = np.zeros(len(idx), dtype=np.bool_)
+            for lit in cl: val |= ((idx >> bit[abs(lit)]) & 1).astype(np.bool_) == (lit > 0)
+            sat &= val
+        return int(sat.reshape(2**len(projected), -1).any(axis=1).sum())
+
+    @staticmethod
+    def _eliminate(clauses: set[frozenset], candidates: set[int]) -> set[frozenset]:
+        # bounded variable elimination: an existentially quantified variable is replaced by the resolvents
+        # of its clauses if they are not more than its clauses. The projected count does not change, and
+        # the definitions of the auxiliary variables of Tseitin encodings are mostly resolved away.
+        occurrences = defaultdict(set)
+        for cl in clauses:
+            for lit in cl: occurrences[lit].add(cl)
+        changed = True
+        while changed:
+            changed = False
+            for v in sorted(candidates):
+                pos, neg = occurrences[v], occurrences[-v]
+                resolvents, bound = set(), len(pos) + len(neg)
+                for p in pos:
+                    for q in neg:
+                        r = (p - {v}) | (q - {-v})
+                        if not any(-lit in r for lit in r): resolvents.add(r)
+                    if len(resolvents) > bound: break
+                if len(resolvents) > bound: continue
+                for cl in pos | neg:
+                    clauses.discard(cl)
+                    for lit in cl: occurrences[lit].discard(cl)
+                for r in resolvents - clauses:
+                    clauses.add(r)
+                    for lit in r: occurrences[lit].add(r)
+                candidates = candidates - {v}
+                changed = True
+        return clauses
+
+    @staticmethod
+    def _components(clauses: frozenset) -> list[frozenset]:
+        # connected components of the clauses, where clauses are connected if they share a variable
+        parent = {}
+        def find(v):
+            while parent.setdefault(v, v) != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+        for cl in clauses:
+            root = find(abs(next(iter(cl))))
+            for lit in cl: parent[find(abs(lit))] = root
+        components = {}
+        for cl in clauses: components.setdefault(find(abs(next(iter(cl)))), set()).add(cl)
+        return [ frozenset(c) for c in components.values() ]
+
+    def __count(self, clauses: frozenset, projected: frozenset) -> int:
+        # number of assignments to the projected variables of clauses that extend to a model
+        variables = { abs(lit) for cl in clauses for lit in cl }
+        current, assigned = _propagate(set(clauses))
+        if current is None: return 0
+        remaining = { abs(lit) for cl in current for lit in cl }
+        factor = 2**len((variables & projected) - assigned - remaining)
+        if len(remaining & projected) == 0:
+            return factor * int(_satisfiable(current))
+        result = factor
+        for component in DPLLCounter._components(frozenset(current)):
+            result *= self.__count_component(component, projected)
+            if result == 0: return 0
+        return result
+
+    def __count_component(self, component: frozenset, projected: frozenset) -> int:
+        variables = { abs(lit) for cl in component for lit in cl }
+        key = (component, frozenset(variables & projected))
+        if key in self.__components: return self.__components[key]
+        if len(variables & projected) == 0:
+            result = int(_satisfiable(component))
+        else:
+            # branch on the projected variable with the most occurrences
+            occurrences = {}
+            for cl in component:
+                for lit in cl:
+                    if abs(lit) in projected: occurrences[abs(lit)] = occurrences.get(abs(lit), 0) + 1
+            v = max(occurrences, key=occurrences.get)
+            result = 0
+            for lit in [v, -v]:
+                branch = { cl - {-lit} for cl in component if lit not in cl }
+                if frozenset() in branch: continue
+                lost = (variables & projected) - { v } - { abs(l) for cl in branch for l in cl }
+                result += self.__count(frozenset(branch), projected) * 2**len(lost)
+        if len(self.__components) >= self.__component_cache_size: self.__components.clear()
+        self.__components[key] = result
+        return result
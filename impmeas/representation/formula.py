@@ -1,8 +1,13 @@
 from .gpmc import GPMC
+from .counter import ModelCounter, DPLLCounter
 from .repr import PseudoBoolFunc
 from .formula_parser import OPERATIONS, PRECEDENCE
-from typing import Union
-import copy
+from .utils import iter_indices, CHUNK
+from typing import Iterable, Union
+from functools import cache
+from collections import OrderedDict
+import weakref
+import numpy as np
 
 _SIMP_RULES = [
     ("~0", "1"),
@@ -58,11 +63,19 @@ _SIMP_RULES = [
     ("A <-> 1", "A"),
 ]
 
+# unique table of all live formula nodes: structurally equal formulas are the same object
+_UNIQUE_TABLE = weakref.WeakValueDictionary()
+
+# marks nodes that are their own simplification (storing the node itself would create a reference cycle)
+_SIMPLIFIED = object()
+
 class Formula(PseudoBoolFunc):
     MUST_ALWAYS_BE_BOOLEAN = True
 
-    def __init__(self, op=None, *children):
-        super().__init__()
+    def __new__(cls, op=None, *children):
+        key = (op, children)
+        node = _UNIQUE_TABLE.get(key)
+        if node is not None: return node
 
         assert op in ["C","V"] or op in OPERATIONS, op
 
@@ -73,62 +86,99 @@ class Formula(PseudoBoolFunc):
         elif op in ["->", "<-", "<->"]: assert len(children) == 2, (op, children)
         elif op in ["|", "&", "^"]: assert len(children) >= 2, (op, children)
 
-        self.__op = op 
-        self.__children = tuple(children)
-        self.__str_repr = None
+        node = super().__new__(cls)
+        node.__op = op 
+        node.__children = tuple(children)
+        node.__hash = hash(key)
+        node.__vars = None
+        node.__size = None
+        node.__str_repr = None
+        node.__simplified = None
+        _UNIQUE_TABLE[key] = node
+        return node
+
+    def __init__(self, op=None, *children):
+        # nodes are hash-consed and initialized in __new__
+        super().__init__()
+
+    def __reduce__(self):
+        return (Formula, (self.op, *self.children))
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _postorder(self, skip=None) -> list["Formula"]:
+        # returns every node of the DAG exactly once, children before their parents. 
+        # nodes for which skip holds are neither expanded nor returned.
+        order, visited, stack = [], set(), [(self, False)]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            if expanded: 
+                order.append(node)
+                continue
+            if id(node) in visited or (skip is not None and skip(node)): continue
+            visited.add(id(node))
+            stack.append((node, True))
+            if node.op not in ["V", "C"]:
+                stack += [ (c, False) for c in reversed(node.children) if id(c) not in visited ]
+        return order
+
+    def _rebuild(self, leaf) -> "Formula":
+        # rebuilds the DAG bottom-up, where leaf maps variables and constants to their replacements
+        memo = {}
+        for node in self._postorder():
+            if node.op in ["V", "C"]: memo[id(node)] = leaf(node)
+            else: memo[id(node)] = Formula(node.op, *(memo[id(c)] for c in node.children))
+        return memo[id(self)]
 
     # --- ABSTRACT METHODS ---
 
     def __getitem__(self, assignment: dict[str, bool]) -> bool:
-        if self.op == "V": return assignment[self.c1]
-        elif self.op == "C": return {"0": False, "1": True}[self.c1]
-        elif self.op == "~": return not self.c1[assignment]
-        else: # 2-ary operation
-            left, right = self.children
-            if self.op == "&":
-                return left[assignment] and right[assignment]
-            elif self.op == "|":
-                return left[assignment] or right[assignment]
-            elif self.op == "<->":
-                return left[assignment] == right[assignment]
-            elif self.op == "->":
-                return not left[assignment] or right[assignment]
-            elif self.op == "<-":
-                return left[assignment] or not right[assignment]
-            elif self.op == "^":
-                return left[assignment] != right[assignment]
+        memo = {}
+        for node in self._postorder():
+            op = node.op
+            if op == "V": val = assignment[node.c1]
+            elif op == "C": val = {"0": False, "1": True}[node.c1]
+            else:
+                vals = [ memo[id(c)] for c in node.children ]
+                if op == "~": val = not vals[0]
+                elif op == "&": val = all(vals)
+                elif op == "|": val = any(vals)
+                elif op == "^": val = sum(vals) % 2 == 1
+                elif op == "<->": val = vals[0] == vals[1]
+                elif op == "->": val = not vals[0] or vals[1]
+                elif op == "<-": val = vals[0] or not vals[1]
+            memo[id(node)] = val
+        return memo[id(self)]
 
     def __hash__(self) -> int:
-        return (self.op, self.children).__hash__()
+        return self.__hash
 
     def __copy__(self) -> "Formula":
-        return Formula(self.op, *(copy.copy(c) for c in self.children))
+        return self
 
     def is_boolean(self):
         return True
 
     @property     
-    def vars(self) -> set[str]:
-        if self.op == "V": return { self.c1 }
-        elif self.op == "C": return set()
-        else: 
-            ret = set()
-            for c in self.children: ret |= c.vars
-            return ret
+    def vars(self) -> frozenset[str]:
+        if self.__vars is None:
+            for node in self._postorder(skip=lambda n: n.__vars is not None):
+                if node.op == "V": node.__vars = frozenset({ node.c1 })
+                elif node.op == "C": node.__vars = frozenset()
+                else: node.__vars = frozenset().union(*(c.__vars for c in node.children))
+        return self.__vars
 
     def cofactor(self, ass: dict[str, int]) -> "Formula":
-        if self.op == "V" and self.c1 in ass: 
-            return Formula.true if ass[self.c1] else Formula.false
-        elif self.op in ["V", "C"]: 
-            return copy.copy(self)
-        else: 
-            return Formula(self.op, *(c.cofactor(ass) for c in self.children))
+        def leaf(node):
+            if node.op == "V" and node.c1 in ass: 
+                return Formula.true if ass[node.c1] else Formula.false
+            return node
+        return self._rebuild(leaf)
 
     def flip(self, S : Union[str,set[str]]) -> "Formula":
         if isinstance(S, str): S = {S}
-        if self.op == "V" and self.c1 in S: return Formula("~", self)
-        elif self.op in ["V", "C"]: return copy.copy(self)
-        else: return Formula(self.op, *(c.flip(S) for c in self.children))
+        return self._rebuild(lambda node: Formula("~", node) if node.op == "V" and node.c1 in S else node)
 
     @classmethod
     @property
@@ -152,30 +202,64 @@ class Formula(PseudoBoolFunc):
     ## THE FOLLOWING IS OVERWRITTEN:
 
     def expectation(self, exists=set()) -> float:
+        # the result is cached (cf. clear_formula_cache)
+        key = (self, "expectation", frozenset(exists))
+        if (value := _cache_get(key)) is None:
+            value = self.__expectation(exists)
+            _cache_put(key, value)
+        return value
+
+    def __expectation(self, exists) -> float:
         simp = self.simplify()
-        if not PMC_SOLVER: 
-            print("PMC_SOLVER not instantiated. iterating over all assignments.")
-            return super(Formula, simp).expectation()
+        solver = PMC_SOLVER or get_default_counter()
         if simp == Formula.false: return 0
         if simp == Formula.true: return 1
+        if PMC_SOLVER is None and len(simp.vars) <= ENUMERATION_LIMIT:
+            # the existentially quantified variables are the least significant bits, so their
+            # assignments are consecutive (and blocks hold whole groups, since they are powers of two)
+            E = [ x for x in simp.vars if x in exists ]
+            vars = [ x for x in simp.vars if x not in exists ] + E
+            chunk = max(2**len(E), 1 << max(0, 24 - len(simp._postorder()).bit_length()))
+            sc = sum(int(block.reshape(-1, 2**len(E)).any(axis=1).sum()) for block in simp.iter_values(vars, chunk))
+            return sc / 2**len(simp.vars)
 
         cnf, var2idx, newvars = simp.tseitin() # create cnf encoding
 
         # existentially quantifies new tseitin variables + those that are explicitly specified
         # we have: tseitin vars ids = all_vars_ids - orig_vars_ids
         exists_ids = set(newvars) | { var2idx[x] for x in exists }
-        sc = PMC_SOLVER.satcount(cnf, exists=exists_ids)
+        sc = solver.satcount(cnf, exists=exists_ids)
         return  sc / 2**len(simp.vars)
 
-    def __eq__(self, other) -> bool: # structural equality!
+    def iter_values(self, vars: list[str] = None, chunk: int = CHUNK) -> Iterable[np.ndarray]:
+        # evaluates the DAG once per block, with one array of values per node
+        vars = list(self.vars) if vars is None else list(vars)
+        n, position, nodes = len(vars), { x: i for i, x in enumerate(vars) }, self._postorder()
+        for block in iter_indices(n, chunk):
+            memo = {}
+            for node in nodes:
+                op = node.op
+                if op == "V": val = ((block >> (n-1-position[node.c1])) & 1).astype(np.bool_)
+                elif op == "C": val = np.full(len(block), node.c1 == "1")
+                else:
+                    vals = [ memo[id(c)] for c in node.children ]
+                    if op == "~": val = ~vals[0]
+                    elif op == "&": val = np.logical_and.reduce(vals)
+                    elif op == "|": val = np.logical_or.reduce(vals)
+                    elif op == "^": val = np.logical_xor.reduce(vals)
+                    elif op == "<->": val = vals[0] == vals[1]
+                    elif op == "->": val = ~vals[0] | vals[1]
+                    elif op == "<-": val = vals[0] | ~vals[1]
+                memo[id(node)] = val
+            yield memo[id(self)]
+
+    def __eq__(self, other) -> bool: # structural equality (nodes are unique, so this is identity)
         if not isinstance(other, Formula):
             raise NotImplementedError()
-        if self.op != other.op: 
-            return False
-        if self.op in ["V", "C"]:
-            return self.children[0] == other.children[0] 
-        else: 
-            return all(c1 == c2 for c1,c2 in zip(self.children, other.children))
+        return self is other
+
+    def __ne__(self, other) -> bool:
+        return not self.__eq__(other)
 
     def __ge__(self, other): raise NotImplementedError()
     def __le__(self, other): raise NotImplementedError()
@@ -189,8 +273,12 @@ class Formula(PseudoBoolFunc):
     # --- END ABSTRACT METHODS ---
 
     def __len__(self) -> int:
-        if self.op in ["V", "C"]: return 1
-        else: return 1 + sum(map(len, self.children))
+        # size of the formula as a tree (shared subformulas are counted once per occurrence)
+        if self.__size is None:
+            for node in self._postorder(skip=lambda n: n.__size is not None):
+                if node.op in ["V", "C"]: node.__size = 1
+                else: node.__size = 1 + sum(c.__size for c in node.children)
+        return self.__size
 
     def treestr(self, indent=0) -> str:
         ind = "  "*indent
@@ -218,20 +306,25 @@ class Formula(PseudoBoolFunc):
         if self.__str_repr is not None:
             return self.__str_repr
 
-        if self.op in ["C", "V"]: 
-            self.__str_repr = self.c1
-        elif self.op == "~": 
-            if self.c1.op in ["C", "V"]: self.__str_repr = "~" + str(self.c1)
-            else: self.__str_repr = "~(" + str(self.c1) + ")"
-        else:
-            child_strings = []
-            for c in self.children: 
-                if PRECEDENCE[c.op] >= PRECEDENCE[self.op]:
-                    child_strings.append( "(" + str(c) + ")" )
-                else:
-                    child_strings.append(str(c))
-            self.__str_repr = f"{self.op}".join(child_strings)
-        return str(self)
+        # emits the tokens in order with an explicit stack (without storing the strings of subformulas)
+        out, stack = [], [self]
+        while len(stack) > 0:
+            item = stack.pop()
+            if isinstance(item, str): out.append(item)
+            elif item.__str_repr is not None: out.append(item.__str_repr)
+            elif item.op in ["C", "V"]: out.append(item.c1)
+            elif item.op == "~": 
+                if item.c1.op in ["C", "V"]: stack += [item.c1, "~"]
+                else: stack += [")", item.c1, "~("]
+            else:
+                tokens = []
+                for idx, c in enumerate(item.children): 
+                    if idx > 0: tokens.append(item.op)
+                    if PRECEDENCE[c.op] >= PRECEDENCE[item.op]: tokens += [ "(", c, ")" ]
+                    else: tokens.append(c)
+                stack += reversed(tokens)
+        self.__str_repr = "".join(out)
+        return self.__str_repr
 
     def is_applicable(self, template: "Formula") -> dict[str, "Formula"]:
         def rec(formula: "Formula", temp: "Formula", replacement: dict):
@@ -251,29 +344,34 @@ class Formula(PseudoBoolFunc):
         else: return None
 
     def simplify(self) -> "Formula":
-        if self.op in ["C", "V"]: 
-            return self
-        else:
-            self_simplified = Formula(self.op, *(c.simplify() for c in self.children))
-            while True:
-                rule_applicable = False
-                for rule, result in SIMP_RULES:
-                    if (replacement := self_simplified.is_applicable(rule)) is not None:
-                        self_simplified = result.replace(replacement)                    
-                        rule_applicable = True 
-                        break
-                if not rule_applicable: break
-            return self_simplified 
+        # single bottom-up pass: every node is simplified once, after its children. The result is
+        # stored on the node, so nodes that were simplified before (also as part of other formulas) are skipped
+        simplified = lambda node: node if node.__simplified is _SIMPLIFIED else node.__simplified
+        for node in self._postorder(skip=lambda n: n.__simplified is not None):
+            if node.op in ["C", "V"]: result = node
+            else: result = _simplify_node(node.op, [ simplified(c) for c in node.children ])
+            node.__simplified = _SIMPLIFIED if result is node else result
+            if result.__simplified is None: result.__simplified = _SIMPLIFIED
+        return simplified(self)
     
     def replace(self, d: dict[str, Union["Formula", str]]):
-        if self.op == "V" and self.c1 in d: 
-            repl = d[self.c1]
-            if isinstance(repl, str): repl = Formula.parse(repl)
-            return copy.copy(repl)
-        elif self.op in ["V", "C"]: return copy.copy(self)
-        else: return Formula(self.op, *(c.replace(d) for c in self.children))
+        def leaf(node):
+            if node.op == "V" and node.c1 in d: 
+                repl = d[node.c1]
+                return Formula.parse(repl) if isinstance(repl, str) else repl
+            return node
+        return self._rebuild(leaf)
 
     def tseitin(self, minimize_new_variables=False) -> tuple[list[list], dict[str, int]]:
+        # the encoding is cached (cf. clear_formula_cache); copies are returned, so callers may modify them
+        key = (self, "tseitin", minimize_new_variables)
+        if (encoding := _cache_get(key)) is None:
+            encoding = self.__tseitin(minimize_new_variables)
+            _cache_put(key, encoding)
+        cnf, *rest = encoding
+        return ([ list(cl) for cl in cnf ], *( type(part)(part) for part in rest ))
+
+    def __tseitin(self, minimize_new_variables) -> tuple[list[list], dict[str, int]]:
         # formula = self.simplify()
         if self == Formula.false or self == Formula.true:
             return [], {}
@@ -284,45 +382,133 @@ class Formula(PseudoBoolFunc):
             formula2tseitinvar = dict()
         
         newvars = [ max(vars2idx.values())+1 ]
-        def _tseitin(formula: Formula, cnf: list):
+        cnf = []
+        # explicit-stack traversal: new variables are assigned when a node is entered and its
+        # clauses are added when it is left, i.e., after its children have been encoded
+        results, stack = [], [(self, None)]
+        while len(stack) > 0:
+            formula, C = stack.pop()
             op = formula.op
-            if op == "C": 
+            if C is not None: # leave the node
+                B = results.pop() if op != "~" else None
+                A = results.pop()
+                if op == "~":
+                    cnf += [[-C, -A], [C, A]]
+                elif op == "<->": cnf += [[-A, -B, C], [A, B, C], [A, -B, -C], [-A, B, -C]]
+                elif op == "<-": cnf += [[A, -B, -C], [-A, C], [B, C]]
+                elif op == "->": cnf += [[-A, B, -C], [A, C], [-B, C]]
+                elif op == "^": cnf += [[-C, -A, -B], [-C, A, B], [C, -A, B], [C, A, -B]]
+                elif op == "&": cnf += [[-A, -B, C], [A, -C], [B, -C]]
+                elif op == "|": cnf += [[A, B, -C], [-A, C], [-B, C]]
+                else: raise Exception(f"operation {op} unknown!")
+                results.append(C)
+            elif op == "C": 
                 raise Exception(f"formula cannot contain 0s or 1s. Simplify first.")
             elif op == "V": 
-                return vars2idx[formula.c1]
+                results.append(vars2idx[formula.c1])
+            elif minimize_new_variables and formula in formula2tseitinvar:
+                results.append(formula2tseitinvar[formula])
             else:
-                if minimize_new_variables and formula in formula2tseitinvar:
-                    C = formula2tseitinvar[formula]
-                else:
-                    C = newvars[-1] 
-                    newvars.append(newvars[-1]+1)
-                    if minimize_new_variables:
-                        formula2tseitinvar[formula] = C
-                A = _tseitin(formula.c1, cnf)
-                if op == "~":
-                    cnf += [[-C, -A], [C, A]]
-                else:
-                    B = _tseitin(formula.c2, cnf)
-                    if op == "<->": cnf += [[-A, -B, C], [A, B, C], [A, -B, -C], [-A, B, -C]]
-                    elif op == "<-": cnf += [[A, -B, -C], [-A, C], [B, C]]
-                    elif op == "->": cnf += [[-A, B, -C], [A, C], [-B, C]]
-                    elif op == "^": cnf += [[-C, -A, -B], [-C, A, B], [C, -A, B], [C, A, -B]]
-                    elif op == "&": cnf += [[-A, -B, C], [A, -C], [B, -C]]
-                    elif op == "|": cnf += [[A, B, -C], [-A, C], [-B, C]]
-                    else: raise Exception(f"operation {op} unknown!")
-                return C
+                C = newvars[-1] 
+                newvars.append(newvars[-1]+1)
+                if minimize_new_variables:
+                    formula2tseitinvar[formula] = C
+                stack.append((formula, C))
+                stack += [ (c, None) for c in reversed(formula.children[:2]) ]
         
-        cnf = []
-        topid = _tseitin(self, cnf)
+        topid = results.pop()
         return [[topid]]+cnf, vars2idx, newvars 
 
 
 SIMP_RULES = [ (Formula.parse(l), Formula.parse(r)) for l,r in _SIMP_RULES ]
-PMC_SOLVER: "GPMC" = None
 
-def set_pmc_solver(solver : GPMC):
+# bounded LRU cache of expectations and Tseitin encodings of formula nodes
+_FORMULA_CACHE = OrderedDict()
+_FORMULA_CACHE_SIZE = 1024
+
+def _cache_get(key):
+    if key not in _FORMULA_CACHE: return None
+    _FORMULA_CACHE.move_to_end(key)
+    return _FORMULA_CACHE[key]
+
+def _cache_put(key, value):
+    _FORMULA_CACHE[key] = value
+    while len(_FORMULA_CACHE) > _FORMULA_CACHE_SIZE:
+        _FORMULA_CACHE.popitem(last=False)
+
+def set_formula_cache_size(maxsize: int):
+    global _FORMULA_CACHE_SIZE
+    _FORMULA_CACHE_SIZE = maxsize
+    while len(_FORMULA_CACHE) > _FORMULA_CACHE_SIZE:
+        _FORMULA_CACHE.popitem(last=False)
+
+def clear_formula_cache():
+    # removes all cached expectations and Tseitin encodings, and the simplifications stored on the nodes
+    _FORMULA_CACHE.clear()
+    for node in list(_UNIQUE_TABLE.values()):
+        node._Formula__simplified = None
+
+# The rules are dispatched on the operator of a node and the shapes of its children, so only the
+# few rules that can match a node are tried (in the order of SIMP_RULES).
+
+def _shape(node: Formula) -> str:
+    # "0" and "1" for constants, "~" for negations and "*" otherwise (a variable of a rule matches every shape)
+    if node.op == "C": return node.c1
+    return "~" if node.op == "~" else "*"
+
+@cache
+def _rules_for(op: str, shapes: tuple[str]) -> list[tuple[Formula, Formula]]:
+    return [ (lhs, rhs) for lhs, rhs in SIMP_RULES if lhs.op == op and len(lhs.children) == len(shapes) and
+             all(_shape(t) in ["*", s] for t, s in zip(lhs.children, shapes)) ]
+
+def _match(node: Formula, template: Formula, binding: dict[str, Formula]) -> bool:
+    if template.op == "V": return binding.setdefault(template.c1, node) is node
+    if template.op == "C": return node is template
+    return node.op == template.op and len(node.children) == len(template.children) and \
+           all(_match(c, t, binding) for c, t in zip(node.children, template.children))
+
+def _instantiate(template: Formula, binding: dict[str, Formula]) -> Formula:
+    # builds the right-hand side of a rule, where every new node is simplified as well
+    if template.op == "V": return binding[template.c1]
+    if template.op == "C": return template
+    return _simplify_node(template.op, [ _instantiate(c, binding) for c in template.children ])
+
+def _fold_constants(op: str, children: list[Formula]) -> Formula:
+    # constant propagation for conjunctions, disjunctions and xors with more than two operands
+    # (the rules only cover the binary case)
+    absorbing = { "&": Formula.false, "|": Formula.true }.get(op)
+    if absorbing is not None and any(c is absorbing for c in children): return absorbing
+    negate = op == "^" and sum(c is Formula.true for c in children) % 2 == 1
+    rest = [ c for c in children if c.op != "C" ]
+    if len(rest) == 0: result = Formula.true if op == "&" else Formula.false
+    elif len(rest) == 1: result = rest[0]
+    else: result = _simplify_node(op, rest)
+    return _simplify_node("~", [result]) if negate else result
+
+def _simplify_node(op: str, children: list[Formula]) -> Formula:
+    # simplifies op(children), where the children are already simplified
+    if len(children) > 2 and any(c.op == "C" for c in children): return _fold_constants(op, children)
+    for lhs, rhs in _rules_for(op, tuple(_shape(c) for c in children)):
+        binding = {}
+        if all(_match(c, t, binding) for c, t in zip(children, lhs.children)):
+            return _instantiate(rhs, binding)
+    return Formula(op, *children)
+PMC_SOLVER: ModelCounter = None
+# in-process counter that is used for expectations if no solver is set
+DEFAULT_COUNTER: ModelCounter = None
+# without a solver, formulas over at most ENUMERATION_LIMIT variables are counted by evaluating them
+# on all assignments, which is faster than counting their Tseitin encoding
+ENUMERATION_LIMIT = 16
+
+def set_pmc_solver(solver : ModelCounter):
     global PMC_SOLVER
+    assert solver is None or isinstance(solver, ModelCounter), "the solver must implement ModelCounter"
     PMC_SOLVER = solver
 
 def get_pmc_solver():
-    return PMC_SOLVER
\ No newline at end of file
+    return PMC_SOLVER
+
+def get_default_counter() -> ModelCounter:
+    global DEFAULT_COUNTER
+    if DEFAULT_COUNTER is None: DEFAULT_COUNTER = DPLLCounter()
+    return DEFAULT_COUNTER
\ No newline at end of file
@@ -1,43 +1,75 @@
 import os
 import re
-from .utils import cnf2dimacs
+import subprocess
+import tempfile
+import threading
+from .utils import write_dimacs
+from .cache import CountCache
+from .counter import ModelCounter
 
-class GPMC:
-    def __init__(self, 
-        src = "/usr/local/bin/gpmc", 
+class GPMC(ModelCounter):
+    def __init__(self,
+        src = "/usr/local/bin/gpmc",
         tmp_filename = "/tmp/dimacs.cnf",
-        bj=True, cs=3500):
-        self.__solver_dir = "/".join(src.split("/")[:-1])
-        self.__solver_name = src.split("/")[-1]
-        self.__tmp_filename = tmp_filename
+        bj=True, cs=3500, workers=None, cache: CountCache=None, stdin=False):
+        # every count is written to its own temporary file in the directory of tmp_filename,
+        # so that up to `workers` solver processes can run concurrently (cf. ModelCounter).
+        # If stdin is set, the CNF is streamed to the solver's standard input instead.
+        super().__init__(workers=workers if workers is not None else (os.cpu_count() or 1), cache=cache)
+        self.__solver_dir = os.path.dirname(src)
+        self.__solver_name = os.path.basename(src)
+        self.__tmp_dir = os.path.dirname(os.path.abspath(tmp_filename))
+        self.__tmp_prefix, self.__tmp_suffix = os.path.splitext(os.path.basename(tmp_filename))
         self.__bj = bj
-        self.__cs = cs 
+        self.__cs = cs
+        self.__stdin = stdin
 
-    def satcount_file(self, cnf_file, debug=False):
-        cnf_file_abs = os.path.abspath(cnf_file)
-        file_content = open(cnf_file, "r").read().split("\n")
-        mode = "2" if "c t pmc" in file_content else "0"
-        command =  f'''
-            cd {self.__solver_dir} && 
-            {self.__solver_dir}/{self.__solver_name} {'-bj' if self.__bj else '-no-bj'} -cs={self.__cs} -mode={mode} {cnf_file_abs}
-        '''
-        ret = os.popen(command).read()
+    def __command(self, mode: str) -> list[str]:
+        return [
+            os.path.join(os.path.abspath(self.__solver_dir), self.__solver_name),
+            '-bj' if self.__bj else '-no-bj', f'-cs={self.__cs}', f'-mode={mode}' ]
+
+    @staticmethod
+    def __parse(ret: str, debug=False):
         if debug: print(ret)
         try:
             satcount = int(float(re.findall(r"c s exact arb int (.*)", ret)[0]))
-            return satcount 
+            return satcount
         except:
             print(ret)
 
-    def satcount(self, cnf: list[list[int]], \
-                 debug=False, exists=set()):
-        with open(self.__tmp_filename, "w") as fw:
-            nr_vars = max(max(abs(lit) for lit in cl) for cl in cnf)
-            all_vars = set(range(1, nr_vars+1))
-            dimacs = cnf2dimacs(cnf, projected=all_vars-exists)
-            fw.write(dimacs)
-        value = self.satcount_file(self.__tmp_filename, debug=debug)
-        os.remove(self.__tmp_filename)
-        return value
+    def satcount_file(self, cnf_file, debug=False, mode=None):
+        cnf_file_abs = os.path.abspath(cnf_file)
+        if mode is None:
+            # only the header (the lines before the first clause) is scanned
+            mode = "0"
+            with open(cnf_file, "r") as fr:
+                for line in fr:
+                    if line.strip() == "c t pmc": mode = "2"
+                    if line.strip() and not line.startswith(("c", "p")): break
+        command = self.__command(mode) + [ cnf_file_abs ]
+        ret = subprocess.run(command, cwd=self.__solver_dir or None, capture_output=True, text=True).stdout
+        return GPMC.__parse(ret, debug=debug)
 
- 
\ No newline at end of file
+    def _satcount(self, cnf: list[list[int]], nr_vars: int, projected: set[int], debug=False):
+        mode = "2" if len(projected) >= 1 else "0"
+        if self.__stdin:
+            with subprocess.Popen(self.__command(mode), cwd=self.__solver_dir or None, text=True,
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+                # stdout is read by a second thread, so that large outputs cannot block the writer
+                ret = []
+                reader = threading.Thread(target=lambda: ret.append(proc.stdout.read()))
+                reader.start()
+                try:
+                    write_dimacs(cnf, proc.stdin, projected=projected, nr_vars=nr_vars)
+                    proc.stdin.close()
+                except BrokenPipeError: pass
+                reader.join()
+            return GPMC.__parse(ret[0], debug=debug)
+        fd, filename = tempfile.mkstemp(suffix=self.__tmp_suffix, prefix=self.__tmp_prefix+"_", dir=self.__tmp_dir)
+        try:
+            with os.fdopen(fd, "w") as fw:
+                write_dimacs(cnf, fw, projected=projected, nr_vars=nr_vars)
+            return self.satcount_file(filename, debug=debug, mode=mode)
+        finally:
+            os.remove(filename)
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from . import formula_parser
-from .utils import iter_assignments
+from .utils import iter_indices, index2assignment, var_weights, CHUNK
+import numpy as np
 from typing import Union, Iterable
 
 class PseudoBoolFunc:
@@ -61,22 +62,37 @@ class PseudoBoolFunc:
     ## END ABSTRACT METHODS
     ## THE FOLLOWING MAY BE OVERWRITTEN
 
+    def at_index(self, idx: int, vars: list[str] = None):
+        # the value of the assignment to vars (default: self.vars) encoded by idx (cf. utils.iter_indices)
+        return self[index2assignment(idx, list(self.vars) if vars is None else vars)]
+
+    def iter_values(self, vars: list[str] = None, chunk: int = CHUNK) -> Iterable[np.ndarray]:
+        # the values of all assignments to vars (default: self.vars) in index order, as blocks of (at most) chunk values
+        vars = list(self.vars) if vars is None else list(vars)
+        # the bits of a block are decoded at once, using the weights of the variables
+        weights = np.array(list(var_weights(vars).values()), dtype=np.int64)
+        for block in iter_indices(len(vars), chunk):
+            bits = (block[:, None] & weights) != 0
+            yield np.array([ self[dict(zip(vars, row))] for row in bits.tolist() ])
+
     def expectation(self) -> float:
-        return sum( self[u] for u in iter_assignments(self.vars) ) / 2**len(self.vars)
+        return sum( block.sum() for block in self.iter_values() ).item() / 2**len(self.vars)
 
     def __le__(self, other):
         if isinstance(other,float) or isinstance(other,int):
-            return all(self[ass] <= other for ass in iter_assignments(self.vars))
+            return all(bool(np.all(block <= other)) for block in self.iter_values())
         elif isinstance(other, PseudoBoolFunc):
-            return all(self[ass] <= other[ass] for ass in iter_assignments(set(self.vars)|set(other.vars)))
+            vars = sorted(set(self.vars)|set(other.vars))
+            return all(bool(np.all(a <= b)) for a, b in zip(self.iter_values(vars), other.iter_values(vars)))
         else:
             raise NotImplementedError()
 
     def __ge__(self, other):
         if isinstance(other,float) or isinstance(other,int):
-            return all(self[ass] >= other for ass in iter_assignments(self.vars))
+            return all(bool(np.all(block >= other)) for block in self.iter_values())
         elif isinstance(other, PseudoBoolFunc):
-            return all(self[ass] >= other[ass] for ass in iter_assignments(set(self.vars)|set(other.vars)))
+            vars = sorted(set(self.vars)|set(other.vars))
+            return all(bool(np.all(a >= b)) for a, b in zip(self.iter_values(vars), other.iter_values(vars)))
         else:
             raise NotImplementedError()
 
@@ -86,40 +102,46 @@ class PseudoBoolFunc:
     def __ne__(self, other): return not PseudoBoolFunc.__eq__(self, other)
     def equivalent(self, other): return PseudoBoolFunc.__eq__(self, other)
 
+    def _minterms(self) -> list[int]:
+        # indices of the true points, where the last variable corresponds to the least significant bit
+        minterms, offset = [], 0
+        for block in self.iter_values():
+            minterms += (np.flatnonzero(block == 1) + offset).tolist()
+            offset += len(block)
+        return minterms
+
     def prime_implicants(self) -> list[dict[str, int]]:
         assert self.is_boolean
-        assert 0 < self.expectation() < 1, "function is constant!"
-
-        us = [ ass for ass in iter_assignments(self.vars) if self[ass] == 1 ] 
-        while True:
-            # select resolvents
-            marked = []
-            for u1 in us:
-                for u2 in us:
-                    # check if they can be resolved, i.e. if there exists EXACTLY one variable 
-                    # that occurs negatively in u1 and positively in u2 (or vice versa)
-                    # and all other variables have the same value
-                    if set(u1.keys()) != set(u2.keys()): continue 
-                    difference = [ var for var in u1 if u1[var] != u2[var] ]
-                    if len(difference) == 1:
-                        # mark for resolution
-                        marked.append((u1, u2, difference[0]))
-
-            # if resolvents exists.... resolve. otherwise, stop.
-            if len(marked) == 0:
-                break
-
-            for (res1, res2, targetvar) in marked:
-                if res1 in us: us.remove(res1)
-                if res2 in us: us.remove(res2)
-                new = res1.copy()
-                del new[targetvar]
-                if new not in us: us.append(new)
-        return us
+        # the result is cached on the object (mutable representations must reset _prime_implicants)
+        if getattr(self, "_prime_implicants", None) is None:
+            assert 0 < self.expectation() < 1, "function is constant!"
+            self._prime_implicants = self._quine_mccluskey()
+        return [ p.copy() for p in self._prime_implicants ]
+
+    def _quine_mccluskey(self) -> list[dict[str, int]]:
+        # cubes are pairs (value, mask) of bitmasks, where the bits in mask are unassigned (and 0 in value).
+        # two cubes are merged iff they have the same mask and their values differ in exactly one bit,
+        # which is found by a hash set lookup instead of comparing all pairs.
+        vars = list(self.vars)
+        n = len(vars)
+        cubes, primes = { (v, 0) for v in self._minterms() }, set()
+        while len(cubes) > 0:
+            merged, next_cubes = set(), set()
+            for v, mask in cubes:
+                for b in range(n):
+                    bit = 1 << b
+                    if (v | mask) & bit or (v | bit, mask) not in cubes: continue
+                    next_cubes.add((v, mask | bit))
+                    merged.add((v, mask))
+                    merged.add((v | bit, mask))
+            primes |= cubes - merged
+            cubes = next_cubes
+        primes = sorted(primes, key=lambda p: (-bin(p[1]).count("1"), -p[0]))
+        return [ { x: bool((v >> (n-1-i)) & 1) for i, x in enumerate(vars) if not (mask >> (n-1-i)) & 1 } for v, mask in primes ]
 
     def branch(self, *vars: list[str]) -> list["PseudoBoolFunc"]:
-        for ass in iter_assignments(vars):
-            yield self.cofactor(ass)
+        for idx in iter_indices(len(vars)):
+            yield self.cofactor(index2assignment(idx, vars))
 
     def forall(self, S:set[str]) -> "PseudoBoolFunc":
         assert self.is_boolean
@@ -134,6 +156,14 @@ class PseudoBoolFunc:
         assert self.is_boolean
         return ~(~self).forall(S)
 
+    def flip_closure(self, S: Union[str, set[str]]) -> "PseudoBoolFunc":
+        # returns self | self.flip(y_1) | ... | self.flip(y_m) for S = { y_1, ..., y_m }
+        assert self.is_boolean
+        if isinstance(S,str): S = {S}
+        result = self
+        for y in S: result = result | self.flip(y)
+        return result
+
     def derivative(self, x:str)->"PseudoBoolFunc":
         assert not type(self).MUST_ALWAYS_BE_BOOLEAN
         f0,f1 = self.branch(x)
@@ -172,48 +202,19 @@ class PseudoBoolFunc:
 
     @classmethod
     def parse(cls, formula: Union[tuple,str]) -> "PseudoBoolFunc":
-        def rec(parsed):
+        if isinstance(formula, str): formula = formula_parser.formula2tree(formula)
+
+        # explicit-stack postorder over the parse tree; shared subtrees are built once
+        results, stack = {}, [(formula, False)]
+        while len(stack) > 0:
+            parsed, expanded = stack.pop()
+            if id(parsed) in results: continue
             op, args = parsed[0], parsed[1:]
-            if op == "C" and args[0] == "0": return cls.false
-            elif op == "C" and args[0] == "1": return cls.true
-            elif op == "V": return cls.var(args[0])
+            if op == "C" and args[0] == "0": results[id(parsed)] = cls.false
+            elif op == "C" and args[0] == "1": results[id(parsed)] = cls.true
+            elif op == "V": results[id(parsed)] = cls.var(args[0])
+            elif expanded: results[id(parsed)] = cls._apply(op, *(results[id(a)] for a in args))
             else:
-                results = []
-                for a in args: results.append(rec(a))
-                return cls._apply(op, *results)
-
-        if isinstance(formula, str): formula = formula_parser.formula2tree(formula)
-        
-        # results = {}
-        # open_subproblems = {}
-        # superproblem = {}
-        # solvable = set()
-
-        # stack = [ formula ]
-        # while len(stack) > 0:
-        #     top = stack.pop()
-        #     op, args = top[0], top[1:]
-
-        #     if op in ["C", "V"]: 
-        #         solvable.add(top)
-        #     else:
-        #         open_subproblems[top] = len(args)
-        #         for a in args: superproblem[a] = top
-
-        # while len(solvable)>0:
-        #     top = solvable.pop()
-        #     op, args = top[0], top[1:]
-
-        #     if op == "C" and args[0] == "0": results[top] = cls.false
-        #     elif op == "C" and args[0] == "1": results[top] = cls.true
-        #     elif op == "V": results[top] = cls.var(args[0])
-        #     else: results[top] = cls._apply(op, *(results[a] for a in args))
-
-        #     if top in superproblem:
-        #         sup = superproblem[top]
-        #         open_subproblems[sup] -= 1
-        #         if open_subproblems[sup] == 0:
-        #             solvable.add(sup)
-
-        #     # else: stack += args 
-        return rec(formula)
\ No newline at end of file
+                stack.append((parsed, True))
+                stack += [ (a, False) for a in reversed(args) if id(a) not in results ]
+        return results[id(formula)]
\ No newline at end of file
@@ -1,16 +1,19 @@
 from typing import Iterable, Union
 from .repr import PseudoBoolFunc
-from .utils import iter_assignments
-import copy
+from .utils import iter_assignments, assignment_matrix, var_weights, reindex, CHUNK
+import numpy as np
 
 class Table(PseudoBoolFunc):
     MUST_ALWAYS_BE_BOOLEAN = False
 
-    def __init__(self, table: list[int], vars: list[str], print_mode="primes"):
+    def __init__(self, table: Union[list, np.ndarray], vars: list[str], print_mode="primes"):
         super().__init__()
-        self.__table = table
+        table = np.asarray(table)
+        if table.dtype != np.bool_: table = table.astype(np.float64)
+        self.__table = table.ravel()
         self.__vars = vars
         self.__print_mode = print_mode
+        self.__weights = None
         assert 2**len(self.vars) == len(self.__table)
 
     def set_print_mode(self, mode):
@@ -18,79 +21,114 @@ class Table(PseudoBoolFunc):
         self.__print_mode = mode
 
     def __getitem__(self, key):
-        return self.__table[self.assignment2idx(key)]
+        # key is either an assignment or a table index (i.e., an assignment encoded as bitmask)
+        if isinstance(key, (int, np.integer)): return self.__table[key].item()
+        return self.__table[self.assignment2idx(key)].item()
 
-    def __hash__(self): 
-        return tuple(self.__table).__hash__() + tuple(self.vars).__hash__()
+    def __hash__(self):
+        # the buffer is normalized to float64, since tables with equal values but different dtypes are equal
+        return hash(self.__table.astype(np.float64).tobytes()) + tuple(self.vars).__hash__()
 
-    def __copy__(self): 
+    def __copy__(self):
         return Table(self.__table.copy(), self.vars.copy())
 
     @property
     def is_boolean(self):
-        return all(c in [0,1] for c in self.__table)
+        if self.__table.dtype == np.bool_: return True
+        return bool(np.all((self.__table == 0) | (self.__table == 1)))
 
     @property
-    def vars(self) -> Iterable[str]: 
+    def vars(self) -> Iterable[str]:
         return self.__vars
 
-    def cofactor(self, ass: dict[str, bool]) -> "Table": 
+    @property
+    def array(self) -> np.ndarray:
+        # the table as a flat array; the last variable corresponds to the least significant bit of the index
+        return self.__table
+
+    def cofactor(self, ass: dict[str, bool]) -> "Table":
         new_vars = [x for x in self.vars if x not in ass]
-        table = Table.zeros(new_vars)
-        for u in iter_assignments(new_vars):
-            table[u] = self[u | ass]
-        return table
+        idx = tuple(int(ass[x]) if x in ass else slice(None) for x in self.vars)
+        return Table(self.tensor[idx].flatten(), new_vars)
 
-    def flip(self, S: Union[str, set[str]]) -> "Table": 
+    def flip(self, S: Union[str, set[str]]) -> "Table":
         if isinstance(S,str): S = {S}
-        table = copy.copy(self)
-        for ass in iter_assignments(self.vars):
-            table[ass] = self[ass | { x: not ass[x] for x in S }]
-        return table
-        
+        axes = tuple(idx for idx, x in enumerate(self.vars) if x in S)
+        return Table(np.flip(self.tensor, axis=axes).flatten(), self.vars.copy())
+
     @classmethod
     @property
-    def false(cls) -> "Table": 
-        return Table([False], [])
+    def false(cls) -> "Table":
+        return Table(np.array([False]), [])
 
     @classmethod
     @property
-    def true(cls) -> "Table": 
-        return Table([True], [])
+    def true(cls) -> "Table":
+        return Table(np.array([True]), [])
 
     @classmethod
     def _apply(cls, op: str, *children) -> "Table":
-        assert all( isinstance(c,PseudoBoolFunc) or isinstance(c,float) or isinstance(c,int) for c in children ) 
-        all_vars = list( set().union( *(set(c.vars) for c in children if isinstance(c, PseudoBoolFunc) )) ) 
-        new_table = Table.zeros(all_vars)
+        assert all( isinstance(c,PseudoBoolFunc) or isinstance(c,float) or isinstance(c,int) for c in children )
+        all_vars = Table._union_vars(*children)
         children_are_boolean = all(c.is_boolean if isinstance(c,PseudoBoolFunc) else c in [0,1] for c in children)
-        for ass in iter_assignments(all_vars):
-            vals = [ c[ass] if isinstance(c, PseudoBoolFunc) else c for c in children ]
-            val = None
+        # the operands are broadcast against each other, so no operand is expanded to all_vars beforehand
+        vals = [ Table._broadcastable(c, all_vars) for c in children ]
+        if op in ["+", "-", "*", "**", "abs"]:
+            vals = [ np.asarray(v, dtype=np.float64) for v in vals ]
             if op == "+": val = vals[0]+vals[1]
             elif op == "-": val = -vals[0]
             elif op == "*": val = vals[0]*vals[1]
             elif op == "**": val = vals[0]**vals[1]
-            elif op == "abs": val = abs(vals[0])
-            elif children_are_boolean:
-                if op == "~": val = not vals[0]
-                elif op == "&": val = vals[0] and vals[1]
-                elif op == "|": val = vals[0] or vals[1]
-                elif op == "^": val = vals[0] != vals[1]
-                elif op == "->": val = not vals[0] or vals[1]
-                elif op == "<-": val = vals[0] or not vals[1]
-                elif op == "<->": val = vals[0] == vals[1]
-                else: raise Exception(f"operation {op} not applicable if all operands are Boolean functions.")
-            else: raise Exception(f"operation {op} not applicable.")
-            new_table[ass] = val
-        return new_table
+            elif op == "abs": val = np.abs(vals[0])
+        elif children_are_boolean:
+            vals = [ np.asarray(v, dtype=np.bool_) for v in vals ]
+            if op == "~": val = ~vals[0]
+            elif op == "&": val = vals[0] & vals[1]
+            elif op == "|": val = vals[0] | vals[1]
+            elif op == "^": val = vals[0] ^ vals[1]
+            elif op == "->": val = ~vals[0] | vals[1]
+            elif op == "<-": val = vals[0] | ~vals[1]
+            elif op == "<->": val = vals[0] == vals[1]
+            else: raise Exception(f"operation {op} not applicable if all operands are Boolean functions.")
+        else: raise Exception(f"operation {op} not applicable.")
+        if np.shape(val) != (2,)*len(all_vars):
+            val = np.broadcast_to(val, (2,)*len(all_vars))
+        return Table(np.ravel(val), all_vars)
 
     @classmethod
     def var(cls, x: str) -> "Table":
-        return Table([False, True], [x])
+        return Table(np.array([False, True]), [x])
 
     def expectation(self) -> float:
-        return sum(self.__table) / 2**len(self.vars)
+        return float(self.__table.sum() / 2**len(self.vars))
+
+    ## END ABSTRACT METHODS
+    ## THE FOLLOWING IS OVERWRITTEN:
+
+    def __le__(self, other):
+        if isinstance(other, Table):
+            all_vars = Table._union_vars(self, other)
+            return bool(np.all(self._broadcastable(self, all_vars) <= self._broadcastable(other, all_vars)))
+        elif isinstance(other,float) or isinstance(other,int):
+            return bool(np.all(self.__table <= other))
+        return super().__le__(other)
+
+    def __ge__(self, other):
+        if isinstance(other, Table):
+            all_vars = Table._union_vars(self, other)
+            return bool(np.all(self._broadcastable(self, all_vars) >= self._broadcastable(other, all_vars)))
+        elif isinstance(other,float) or isinstance(other,int):
+            return bool(np.all(self.__table >= other))
+        return super().__ge__(other)
+
+    def __eq__(self, other):
+        if isinstance(other, Table):
+            all_vars = Table._union_vars(self, other)
+            return bool(np.all(self._broadcastable(self, all_vars) == self._broadcastable(other, all_vars)))
+        return super().__eq__(other)
+
+    def __ne__(self, other): return not self.__eq__(other)
+    def equivalent(self, other): return self.__eq__(other)
 
     # --- END ABSTRACT METHODS ---
 
@@ -103,9 +141,12 @@ class Table(PseudoBoolFunc):
         return Table(self.__table, cpy_vars)
 
     def __setitem__(self, key, val):
-        if isinstance(key, dict): 
+        if isinstance(key, dict):
             key = self.assignment2idx(key)
+        if self.__table.dtype == np.bool_ and val not in [0,1]:
+            self.__table = self.__table.astype(np.float64)
         self.__table[key] = val
+        self._prime_implicants = None
 
     # def resort(self, new_vars: Iterable[str]) -> "PseudoBoolFunc":
     #     assert set(new_vars) == set(self.vars)
@@ -114,16 +155,77 @@ class Table(PseudoBoolFunc):
     #         cpy[ass] = self[ass]
     #     return cpy
 
+    def _minterms(self) -> list[int]:
+        return np.flatnonzero(self.__table).tolist()
+
+    @property
+    def weights(self) -> dict[str, int]:
+        # the weight of every variable in the table index; the last variable is the least significant bit
+        if self.__weights is None: self.__weights = var_weights(self.vars)
+        return self.__weights
+
     def assignment2idx(self, assignment: dict[str, bool]) -> int:
-        table_index = 0
-        for idx in range(len(self.vars)):
-            v = self.vars[len(self.vars)-idx-1]
-            if assignment[v]: table_index += 2**idx
-        return table_index
+        return sum(weight for x, weight in self.weights.items() if assignment[x])
+
+    def assignments2idx(self, assignments: Union[np.ndarray, list], vars: list[str] = None) -> np.ndarray:
+        # table indices of many assignments, which are given either as a 1D-array of indices (bitmasks)
+        # or a 2D-array whose columns correspond to vars (default: self.vars) or a list of assignments
+        if isinstance(assignments, np.ndarray) and assignments.ndim == 1:
+            return reindex(assignments.astype(np.int64), self.vars if vars is None else vars, self.vars)
+        if isinstance(assignments, np.ndarray):
+            bits = assignment_matrix(assignments, self.vars, self.vars if vars is None else vars)
+        else:
+            bits = assignment_matrix(list(assignments), self.vars)
+        return bits.astype(np.int64) @ (1 << np.arange(len(self.vars)-1, -1, -1, dtype=np.int64))
+
+    def at_index(self, idx: int, vars: list[str] = None):
+        return self.__table[idx if vars is None else reindex(idx, vars, self.vars)].item()
+
+    def iter_values(self, vars: list[str] = None, chunk: int = CHUNK) -> Iterable[np.ndarray]:
+        values = self.__table if vars is None else Table._aligned(self, list(vars))
+        for start in range(0, len(values), chunk):
+            yield values[start:start+chunk]
+
+    def evaluate(self, assignments: Union[np.ndarray, list], vars: list[str] = None) -> np.ndarray:
+        # the values of many assignments in one vectorized call (cf. assignments2idx)
+        return self.__table[self.assignments2idx(assignments, vars)]
+
+    @property
+    def tensor(self) -> np.ndarray:
+        # view of the table as an array with one axis of length 2 per variable (in the order of self.vars)
+        return self.__table.reshape((2,)*len(self.vars))
+
+    @staticmethod
+    def _union_vars(*children) -> list[str]:
+        # the variables of the children in the order of their first appearance (which is deterministic
+        # and keeps the order of the first operand)
+        all_vars = []
+        for c in children:
+            if isinstance(c, PseudoBoolFunc): all_vars += [ x for x in c.vars if x not in all_vars ]
+        return all_vars
+
+    @staticmethod
+    def _broadcastable(f: Union["PseudoBoolFunc", int, float], vars: list[str]) -> Union[np.ndarray, int, float]:
+        # returns the values of f as an array with one axis per variable in vars (which must contain f's variables),
+        # where the axes of variables that f does not depend on have length 1
+        if not isinstance(f, PseudoBoolFunc): return f
+        if not isinstance(f, Table):
+            return np.concatenate(list(f.iter_values(vars))).reshape((2,)*len(vars))
+        if f.vars == vars: return f.tensor
+        position = { x: idx for idx, x in enumerate(f.vars) }
+        tensor = np.transpose(f.tensor, [ position[x] for x in vars if x in position ])
+        return tensor.reshape(tuple(2 if x in position else 1 for x in vars))
+
+    @staticmethod
+    def _aligned(f: Union["PseudoBoolFunc", int, float], vars: list[str]) -> Union[np.ndarray, int, float]:
+        # returns the values of f as a flat array over vars (which must contain f's variables)
+        if not isinstance(f, PseudoBoolFunc): return f
+        if isinstance(f, Table) and f.vars == vars: return f.array
+        return np.broadcast_to(Table._broadcastable(f, vars), (2,)*len(vars)).ravel()
 
     def __repr__(self):
         if self.__print_mode == "table" or not self.is_boolean:
-            ret = " ".join(self.vars) + " f" + "\n" + "-"*(len(self.vars)*2+1) 
+            ret = " ".join(self.vars) + " f" + "\n" + "-"*(len(self.vars)*2+1)
             for ass in iter_assignments(self.vars):
                 ret += "\n" + " ".join({True: "1", False: "0"}[ass[x]] for x in self.vars)
                 ret += f" {float(self[ass]):.5}"
@@ -139,4 +241,4 @@ class Table(PseudoBoolFunc):
 
     @classmethod
     def zeros(cls, vars: list[str]) -> "Table":
-        return Table([0 for _ in range(2**len(vars))], vars)
+        return Table(np.zeros(2**len(vars)), vars)
@@ -1,4 +1,6 @@
-from typing import Iterable
+from typing import Iterable, Union
+import numpy as np
+import io
 
 def cnf2dimacs(cnf, projected=set()):
     # example output for input = ([{1,2,-3},{-2,3}], projected_set={1,2})
@@ -10,16 +12,117 @@ def cnf2dimacs(cnf, projected=set()):
     #     1 2 -3 0
     #     -2 3 0
     # '''
-    nr_vars = max(max(map(abs, clause)) for clause in cnf)
+    out = io.StringIO()
+    write_dimacs(cnf, out, projected=projected)
+    return out.getvalue()
+
+def _clause_lines(cnf) -> Iterable[str]:
+    # cnf is a list of clauses (iterables or integer arrays) or a 2D integer array whose rows are
+    # clauses, where zeros are ignored (so rows of different length can be padded with zeros)
+    for cl in cnf:
+        if isinstance(cl, np.ndarray): cl = cl[cl != 0].tolist()
+        yield " ".join(map(str, cl)) + " 0\n"
+
+def write_dimacs(cnf, fw, projected=set(), nr_vars: int = None):
+    # writes cnf (cf. _clause_lines) in DIMACS format to the text file object fw (e.g. a pipe), clause by clause
+    if nr_vars is None:
+        if isinstance(cnf, np.ndarray): nr_vars = int(np.abs(cnf).max(initial=0))
+        else: nr_vars = max((max(map(abs, cl), default=0) for cl in cnf), default=0)
     is_projected = len(projected) >= 1
-    ret = f"p cnf {nr_vars} {len(cnf)}\n"
-    ret += "c t pmc\n" if is_projected else "c t mc\n"
-    if is_projected: ret += "c p show " + " ".join(map(str, projected)) + " 0\n"
-    for cl in cnf: ret += " ".join(map(str, cl)) + " 0\n"
-    return ret
+    fw.write(f"p cnf {nr_vars} {len(cnf)}\n")
+    fw.write("c t pmc\n" if is_projected else "c t mc\n")
+    if is_projected: fw.write("c p show " + " ".join(map(str, projected)) + " 0\n")
+    fw.writelines(_clause_lines(cnf))
+
+def read_dimacs(fr) -> tuple[Iterable[list[int]], dict]:
+    # reads a CNF in DIMACS format from an iterable of lines (e.g. a file object) without loading it
+    # into memory. Returns a generator of the clauses and a dict that is filled with the header
+    # ("nr_vars", "nr_clauses" and, if given, the projected variables "show") while reading.
+    header = {}
+    def clauses():
+        clause = []
+        for line in fr:
+            tokens = line.split()
+            if len(tokens) == 0: continue
+            if tokens[0] == "c":
+                if tokens[1:3] == ["p", "show"]: header["show"] = { int(v) for v in tokens[3:] if v != "0" }
+                continue
+            if tokens[0] == "p":
+                header["nr_vars"], header["nr_clauses"] = int(tokens[2]), int(tokens[3])
+                continue
+            if tokens[0] == "%": break
+            # clauses are terminated by 0 and may span several lines
+            for lit in map(int, tokens):
+                if lit == 0:
+                    yield clause
+                    clause = []
+                else: clause.append(lit)
+        if len(clause) > 0: yield clause
+    return clauses(), header
+
+CHUNK = 1 << 16
 
 def iter_assignments(vars: Iterable[str]) -> Iterable[dict[str, int]]:
     vs_sorted = list(vars)[::-1]
     for ass in range(2**len(vs_sorted)):
         yield { v: bool((ass >> j) % 2) for j,v in enumerate(vs_sorted) }
- 
\ No newline at end of file
+
+# Assignments to a list of variables vars can also be encoded as integers (bitmasks), where
+# vars[-1] is the least significant bit. This is the order of iter_assignments and the row
+# order of tables, and assignments can be projected and merged by bit operations.
+
+def iter_indices(n: int, chunk: int = None) -> Iterable[Union[int, np.ndarray]]:
+    # enumerates the assignments to n variables as integers; if chunk is given,
+    # blocks of (at most) chunk consecutive indices are yielded as arrays
+    if chunk is None:
+        yield from range(2**n)
+        return
+    for start in range(0, 2**n, chunk):
+        yield np.arange(start, min(start+chunk, 2**n), dtype=np.int64)
+
+def var_weights(vars: Iterable[str]) -> dict[str, int]:
+    vars = list(vars)
+    return { x: 1 << (len(vars)-1-idx) for idx, x in enumerate(vars) }
+
+def assignment2index(assignment: dict[str, bool], vars: Iterable[str]) -> int:
+    vars = list(vars)
+    return sum(1 << (len(vars)-1-i) for i, x in enumerate(vars) if assignment[x])
+
+def index2assignment(idx: int, vars: Iterable[str]) -> dict[str, bool]:
+    vars = list(vars)
+    return { x: bool((idx >> (len(vars)-1-i)) & 1) for i, x in enumerate(vars) }
+
+def reindex(idx: Union[int, np.ndarray], src: Iterable[str], dst: Iterable[str]) -> Union[int, np.ndarray]:
+    # maps (an array of) indices over src to indices over dst. Variables of src that do not occur
+    # in dst are dropped (projection), variables of dst that do not occur in src are set to 0
+    # (so assignments to disjoint variables are merged by or-ing their reindexed indices).
+    src, dst = list(src), list(dst)
+    if src == dst: return idx
+    position = { x: i for i, x in enumerate(src) }
+    n, m = len(src), len(dst)
+    result = idx & 0
+    for j, x in enumerate(dst):
+        if x in position: result = result | (((idx >> (n-1-position[x])) & 1) << (m-1-j))
+    return result
+
+def popcount(idx: Union[int, np.ndarray]) -> Union[int, np.ndarray]:
+    # the number of true variables of (an array of) indices
+    if not isinstance(idx, np.ndarray): return int(idx).bit_count()
+    if hasattr(np, "bitwise_count"): return np.bitwise_count(idx).astype(np.int64)
+    count = np.zeros(len(idx), dtype=np.int64)
+    for b in range(int(idx.max(initial=0)).bit_length()): count += (idx >> b) & 1
+    return count
+ 
+def assignment_matrix(us: Union[np.ndarray, list[dict[str, bool]]], columns: list[str], vars: list[str] = None) -> np.ndarray:
+    # returns a Boolean matrix whose rows are the assignments in us restricted to columns.
+    # us is either a list of assignments, a 2D-array whose columns correspond to vars or
+    # a 1D-array of indices of assignments to vars (where vars[-1] is the least significant bit)
+    if isinstance(us, np.ndarray):
+        assert vars is not None, "the variables of us must be given"
+        vars = list(vars)
+        position = { x: idx for idx, x in enumerate(vars) }
+        if us.ndim == 1:
+            shifts = np.array([ len(vars)-1-position[x] for x in columns ], dtype=np.int64)
+            return ((us.astype(np.int64)[:, None] >> shifts) & 1).astype(np.bool_).reshape(len(us), len(columns))
+        return np.asarray(us, dtype=np.bool_)[:, [ position[x] for x in columns ]].reshape(len(us), len(columns))
+    return np.array([ [ bool(u[x]) for x in columns ] for u in us ], dtype=np.bool_).reshape(len(us), len(columns))
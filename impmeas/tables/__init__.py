@@ -0,0 +1,3 @@
+from .basic import banzhaf_all, influence_all, shapley, shapley_all
+from .cgm import omega, nu, hkr
+from .blame import blame, scs, d, mscs, scs_all, d_all, mscs_all, scs_many, d_many, mscs_many
@@ -0,0 +1,39 @@
+from ..representation import Table
+import numpy as np
+import math
+
+def _halves(f: Table):
+    # yields, for every variable x, the cofactors f[x/0] and f[x/1] as (strided) views of the table
+    n = len(f.vars)
+    for idx, x in enumerate(f.vars):
+        halves = f.array.reshape(2**idx, 2, 2**(n-idx-1))
+        yield x, halves[:, 0, :], halves[:, 1, :]
+
+def banzhaf_all(f: Table) -> dict[str, float]:
+    n = len(f.vars)
+    return { x: float(f1.sum()/2**(n-1) - f0.sum()/2**(n-1)) for x, f0, f1 in _halves(f) }
+
+def influence_all(f: Table) -> dict[str, float]:
+    assert f.is_boolean
+    n = len(f.vars)
+    return { x: np.count_nonzero(f0 != f1)/2**(n-1) for x, f0, f1 in _halves(f) }
+
+def _popcounts(m: int) -> np.ndarray:
+    # number of ones in the binary representation of 0, ..., 2^m-1
+    pc = np.zeros(1, dtype=np.int64)
+    for _ in range(m): pc = np.concatenate([pc, pc+1])
+    return pc
+
+def _shapley(f0: np.ndarray, f1: np.ndarray, n: int) -> float:
+    # sums the marginal contributions f1-f0 per coalition size and weighs them
+    marg = np.asarray(f1, dtype=np.float64) - np.asarray(f0, dtype=np.float64)
+    per_size = np.bincount(_popcounts(n-1), weights=marg.ravel(), minlength=n)
+    weights = np.array([ 1/(n*math.comb(n-1,k)) for k in range(n) ])
+    return float(per_size @ weights)
+
+def shapley(f: Table, x: str) -> float:
+    if x not in f.vars: return 0
+    return _shapley(f.cofactor({x: False}).array, f.cofactor({x: True}).array, len(f.vars))
+
+def shapley_all(f: Table) -> dict[str, float]:
+    return { x: _shapley(f0, f1, len(f.vars)) for x, f0, f1 in _halves(f) }
@@ -0,0 +1,148 @@
+from ..representation import Table
+from typing import Union
+import numpy as np
+
+def _distances(target: np.ndarray, axes: list[int]) -> np.ndarray:
+    # multi-source BFS on the hypercube: the minimal number of flips of the given axes
+    # that lead from an assignment to an assignment in target (len(axes)+1 if unreachable)
+    unreachable = len(axes)+1
+    dist = np.where(target, 0, unreachable)
+    for _ in range(len(axes)):
+        new_dist = dist
+        for axis in axes: new_dist = np.minimum(new_dist, np.flip(dist, axis=axis)+1)
+        if np.array_equal(new_dist, dist): break
+        dist = new_dist
+    return dist
+
+def _as_table(dist: np.ndarray, unreachable: int, vars: list[str]) -> Table:
+    return Table(np.where(dist >= unreachable, float("inf"), dist).ravel(), list(vars))
+
+def _scs_distances(f: Table, x: str) -> tuple[np.ndarray, np.ndarray]:
+    # distances to the critical assignments of f with value 0 and 1 (x is never flipped)
+    tensor = np.asarray(f.tensor, dtype=np.bool_)
+    idx = f.vars.index(x)
+    flipped = np.flip(tensor, axis=idx)
+    axes = [ axis for axis in range(len(f.vars)) if axis != idx ]
+    return _distances(~tensor & flipped, axes), _distances(tensor & ~flipped, axes)
+
+def d_all(f: Table) -> Table:
+    # d(f,u) for all assignments u
+    assert f.is_boolean
+    n = len(f.vars)
+    return _as_table(_distances(np.asarray(f.tensor, dtype=np.bool_), list(range(n))), n+1, f.vars)
+
+def scs_all(f: Table, x: str) -> Table:
+    # scs(f,x,u) for all assignments u
+    assert f.is_boolean
+    assert x in f.vars
+    dist0, dist1 = _scs_distances(f, x)
+    return _as_table(np.where(np.asarray(f.tensor, dtype=np.bool_), dist1, dist0), len(f.vars), f.vars)
+
+def mscs_all(f: Table, x: str) -> Table:
+    # mscs(f,x,u) for all assignments u
+    assert f.is_boolean
+    assert x in f.vars
+    tensor = np.asarray(f.tensor, dtype=np.bool_)
+    idx = f.vars.index(x)
+    derivative = tensor ^ np.flip(tensor, axis=idx)
+    axes = [ axis for axis in range(len(f.vars)) if axis != idx ]
+    return _as_table(_distances(derivative, axes), len(f.vars), f.vars)
+
+def scs(f: Table, x: str, u: dict[str,bool], c=None) -> float:
+    assert f.is_boolean
+    assert x in f.vars
+    if c is None: c = f[u]
+    dist0, dist1 = _scs_distances(f, x)
+    dist = (dist1 if c else dist0).ravel()[f.assignment2idx(u)]
+    return float("inf") if dist >= len(f.vars) else int(dist)
+
+def d(f: Table, u: dict[str,bool]) -> float:
+    dist = d_all(f)[u]
+    return dist if dist == float("inf") else int(dist)
+
+def mscs(f: Table, x: str, u: dict[str,bool]) -> float:
+    # the derivative does not depend on x, hence u need not assign x
+    dist = mscs_all(f, x)[u | { x: u.get(x, False) }]
+    return dist if dist == float("inf") else int(dist)
+
+def _gather(dist: np.ndarray, unreachable: int, indices: np.ndarray) -> np.ndarray:
+    dist = dist.ravel()[indices]
+    return np.where(dist >= unreachable, float("inf"), dist).astype(np.float64)
+
+def scs_many(f: Table, x: str, us: Union[np.ndarray, list[dict[str,bool]]], c=None, vars: list[str] = None) -> np.ndarray:
+    # scs(f,x,u,c) for every u in us, read off the BFS distances
+    assert f.is_boolean
+    assert x in f.vars
+    indices = f.assignments2idx(us, vars)
+    cs = f.array.astype(np.bool_)[indices] if c is None else np.full(len(indices), bool(c))
+    dist0, dist1 = _scs_distances(f, x)
+    return np.where(cs, _gather(dist1, len(f.vars), indices), _gather(dist0, len(f.vars), indices))
+
+def d_many(f: Table, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    assert f.is_boolean
+    n = len(f.vars)
+    return _gather(_distances(np.asarray(f.tensor, dtype=np.bool_), list(range(n))), n+1, f.assignments2idx(us, vars))
+
+def mscs_many(f: Table, x: str, us: Union[np.ndarray, list[dict[str,bool]]], vars: list[str] = None) -> np.ndarray:
+    # the distances do not depend on x, so they are taken at x=0 and us need not assign x.
+    # Arrays are over f.vars by default (not over the variables of g), x is projected away
+    dist = np.take(mscs_all(f, x).tensor, 0, axis=f.vars.index(x))
+    g = Table(dist.ravel(), [ y for y in f.vars if y != x ])
+    return g.array[g.assignments2idx(us, f.vars if vars is None else vars)].astype(np.float64)
+
+def blame(f: Table, x: str, rho = lambda x: 1/(x+1), cutoff=0, modified=False, debug=False):
+    # follows the iteration of fallback.blame, but the levels are read off the BFS distances
+    assert f.is_boolean
+    if x not in f.vars: return 0, 0
+    if debug: print(f"=== COMPUTING BLAME for {x} in {f} ===")
+
+    n = len(f.vars)
+    if modified:
+        dist = mscs_all(f, x).array
+        levels = [ dist ] # the levels of g_mod(f,x,k)
+    else:
+        dist0, dist1 = _scs_distances(f, x)
+        dist = np.where(f.array.astype(np.bool_), dist1.ravel(), dist0.ravel())
+        levels = [ dist0.ravel(), dist1.ravel() ] # the levels of g(f,x,0,k) and g(f,x,1,k)
+    counts = np.bincount(dist[dist < n].astype(np.int64), minlength=n)
+
+    result = 0
+    last_ell_ex = 0
+    ub_max_increase = 1
+    stopping_reason = "finished iteration."
+    for k in range(n):
+        if debug and k > 0: print()
+        if debug: print(f"k={k}", end=" ")
+
+        # early stopping criteria
+        if rho(k) == 0:
+            stopping_reason = f"stopped because rho({k}) = 0"
+            break
+
+        if not any(np.any(level == k) for level in levels):
+            stopping_reason = f"stopped earlier because no change occurred at level {k}."
+            ub_max_increase = 0
+            break
+
+        new_ell_ex = last_ell_ex + int(counts[k])/2**n
+        t_ex = new_ell_ex - last_ell_ex
+        last_ell_ex = new_ell_ex
+
+        d_result = rho(k)*t_ex
+        if debug: print(f"d result={d_result:.4f}", end=" ")
+        result = result + d_result
+        ub_max_increase = rho(k+1)*(1 - new_ell_ex)
+        if debug: print(f"max increase possible={ub_max_increase:.4f}", end=" ")
+
+        if ub_max_increase <= cutoff:
+            stopping_reason = f"stopped earlier because cannot improve above cutoff={cutoff:.4f}.\n" + \
+                              f"current value: {result:.4f}, can only be increased by {ub_max_increase:.4f}."
+            break
+
+        ub_max_increase = 0
+
+    if debug:
+        print()
+        print(stopping_reason)
+        print(f"=== DONE ===")
+    return result, result + ub_max_increase
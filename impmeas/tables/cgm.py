@@ -0,0 +1,49 @@
+from ..representation import Table
+import numpy as np
+
+# the lattice of a table over n variables has 3^n entries and is computed in O(n*3^n) time,
+# so e.g. 14 variables already need ~38MB (float64) per intermediate copy. Larger tables
+# are rejected instead of exhausting memory (the BDD or fallback implementations scale better).
+LATTICE_LIMIT = 14
+
+def _extend(tensor: np.ndarray, star) -> np.ndarray:
+    # extends every axis of length 2 to length 3, where index 2 (*) is star(f[x/0], f[x/1])
+    if tensor.ndim > LATTICE_LIMIT:
+        raise Exception(f"the lattice of a table over {tensor.ndim} variables has 3^{tensor.ndim} entries (limit: {LATTICE_LIMIT} variables)")
+    for axis in range(tensor.ndim):
+        f0, f1 = np.take(tensor, 0, axis=axis), np.take(tensor, 1, axis=axis)
+        tensor = np.stack([f0, f1, star(f0, f1)], axis=axis)
+    return tensor
+
+def _reduce(lattice: np.ndarray, absent, present) -> np.ndarray:
+    # maps every axis of length 3 back to length 2, where index 0 (x not in S) is absent(f[x/0], f[x/1], f[x/*])
+    # and index 1 (x in S) is present(f[x/0], f[x/1], f[x/*])
+    for axis in range(lattice.ndim):
+        f0, f1, fs = (np.take(lattice, idx, axis=axis) for idx in range(3))
+        lattice = np.stack([absent(f0, f1, fs), present(f0, f1, fs)], axis=axis)
+    return lattice
+
+def omega(f: Table) -> Table:
+    # omega_f(S) = exists S. forall ~S. f
+    assert f.is_boolean
+    lattice = _extend(np.asarray(f.tensor, dtype=np.bool_), lambda f0, f1: f0 & f1)
+    lattice = _reduce(lattice, lambda f0, f1, fs: fs, lambda f0, f1, fs: f0 | f1)
+    return Table(lattice.ravel(), list(f.vars))
+
+def nu(f: Table) -> Table:
+    # nu_f(S) = forall ~S. exists S. f
+    assert f.is_boolean
+    lattice = _extend(np.asarray(f.tensor, dtype=np.bool_), lambda f0, f1: f0 | f1)
+    lattice = _reduce(lattice, lambda f0, f1, fs: f0 & f1, lambda f0, f1, fs: fs)
+    return Table(lattice.ravel(), list(f.vars))
+
+def hkr(f: Table, kappa = lambda x: 4*(0.5-x)**2) -> Table:
+    assert f.is_boolean
+    # expectations of all cofactors, where * leaves the variable unassigned
+    lattice = _extend(np.asarray(f.tensor, dtype=np.float64), lambda f0, f1: (f0+f1)/2)
+    # kappa is only evaluated once per distinct expectation (it need not be vectorized)
+    values, inverse = np.unique(lattice, return_inverse=True)
+    lattice = np.array([ kappa(float(v)) for v in values ], dtype=np.float64)[inverse].reshape(lattice.shape)
+    # variables in S are averaged over their two values, the others are left unassigned
+    lattice = _reduce(lattice, lambda f0, f1, fs: fs, lambda f0, f1, fs: (f0+f1)/2)
+    return Table(lattice.ravel(), list(f.vars))
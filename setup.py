@@ -8,6 +8,7 @@ setup(
                 "impmeas",
                 "impmeas.bdds",
                 "impmeas.mc",
+                "impmeas.tables",
                 "impmeas.fallback",
                 "impmeas.representation"
             ],
@@ -1,9 +1,10 @@
 import impmeas as imp
+import math
     
 imp.set_pmc_solver(imp.GPMC())
 imp.buddy_initialize(list("xyzvw"))
 
-Rs = [ imp.Table, imp.Formula, imp.BuddyNode ]
+Rs = [ imp.Table, imp.Formula, imp.BuddyNode, imp.CNFFunction ]
 
 def test_compositions():
     for R in Rs:
@@ -19,7 +20,7 @@ def test_compositions():
 
         assert f0.expectation() == 0.25
         assert f0.flip("x").equivalent(R.parse("~x & (y ^ z)"))
-        if R in [imp.Table, imp.Formula]:
+        if R in [imp.Table, imp.Formula, imp.CNFFunction]:
             assert f0.replace({"x":"y", "y":"x"}).equivalent(R.parse("y & (x ^ z)"))
 
         if R == imp.Formula:
@@ -30,4 +31,18 @@ def test_pseudo_boolean():
     x,z = imp.Table.var("x"), imp.Table.var("z")
     assert f0.derivative("y").equivalent(x*(1-2*z))
     assert (f0**2).equivalent(f0)
-    assert (1-f0).equivalent(~f0)
\ No newline at end of file
+    assert (1-f0).equivalent(~f0)
+
+def test_bdd_weighted_counts():
+    imp.buddy_initialize(list("xyzvw"))
+    p = { "x": 0.1, "y": 0.5, "z": 0.7, "v": 0.3, "w": 0.9 }
+    for expr in ["x & (y ^ z)", "x | v -> ~w", "y <-> z", "0", "1"]:
+        f, t = imp.BuddyNode.parse(expr), imp.Table.parse(expr)
+        counts, prob = [0]*6, 0
+        for ass in imp.iter_assignments(list("xyzvw")):
+            if not t[{ x: ass[x] for x in t.vars }]: continue
+            counts[sum(ass.values())] += 1
+            prob += math.prod(p[x] if ass[x] else 1-p[x] for x in ass)
+        assert f.satcount_by_weight() == counts
+        assert abs(f.expectation(p) - prob) < 1e-10
+        assert f.expectation({}) == f.expectation()
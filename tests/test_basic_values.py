@@ -78,4 +78,24 @@ def test_values():
         form = imp.Formula.parse(form)
         I_form = imp.influence(form, "x1")
         I_cnf = imp.influence_cnf(cnf, 1, imp.GPMC())
-        assert abs(I_form - I_cnf) <= 1e-10
\ No newline at end of file
+        assert abs(I_form - I_cnf) <= 1e-10
+
+def test_all_values():
+    imp.set_pmc_solver(imp.GPMC())
+    imp.buddy_initialize([f"x{i}" for i in range(1,7)])
+
+    for _ in range(10):
+        _, formula = imp.random_k_cnf(6, 5, 3)
+        for cls in [ imp.Table, imp.BuddyNode ]:
+            f = cls.parse(formula)
+            for method, method_all in [ (imp.banzhaf, imp.banzhaf_all), (imp.influence, imp.influence_all), (imp.shapley, imp.shapley_all) ]:
+                values = method_all(f)
+                assert set(values) == set(f.vars)
+                for x in f.vars:
+                    assert approx(values[x], method(f, x)), (cls, formula, x)
+
+        t = imp.Table.parse(formula)
+        f = imp.Formula.parse(formula)
+        for x in t.vars:
+            assert approx(imp.shapley(f, x), imp.fallback.shapley(t, x))
+        assert imp.ranking_from_val(imp.banzhaf, t) == imp.ranking_from_val(lambda f,x: imp.banzhaf(f,x), t)
@@ -106,3 +106,12 @@ def test_type_invariance():
             for T in imp.iter_assignments(Xss):
                 piT = { pi[x]: T[x] for x in T }
                 assert v_h[T] == v_g[piT]
+
+def test_lattice():
+    '''
+        checks whether the lattice-based CGMs for tables agree with the recursive definitions
+    '''
+    for _ in range(50):
+        f = imp.random_table(X[:4])
+        for lattice, definition in [ (imp.dominating_cgm, imp.fallback.omega), (imp.rectifying_cgm, imp.fallback.nu) ]:
+            assert lattice(f) == definition(f)
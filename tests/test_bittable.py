@@ -0,0 +1,35 @@
+import impmeas as imp
+from utils import X
+
+TOLERANCE = 1e-10
+
+def test_operations():
+    '''
+        checks whether the bit-packed tables agree with the corresponding tables
+        for Boolean operations, cofactors, flips and derivatives
+    '''
+    for n in [2, 5, 7, 9]:
+        for _ in range(10):
+            f, g = imp.random_table(X[:n]), imp.random_table(X[1:n+1])
+            bf, bg = imp.BitTable.from_table(f), imp.BitTable.from_table(g)
+            for op in ["__and__", "__or__", "__xor__", "__rshift__", "__lshift__", "biimp"]:
+                assert getattr(bf, op)(bg).to_table() == getattr(f, op)(g)
+            assert (~bf).to_table() == ~f
+            S = imp.random_subset(X[:n])
+            assert bf.flip(S).to_table() == f.flip(S)
+            u = imp.random_assignment(imp.random_subset(X[:n]))
+            assert bf.cofactor(u).to_table() == f.cofactor(u)
+            for x in X[:n]:
+                assert bf.boolean_derivative(x).to_table() == f.boolean_derivative(x)
+            assert bf.expectation() == f.expectation()
+
+def test_values():
+    '''
+        checks whether the influence and the banzhaf value agree for both representations
+    '''
+    for _ in range(20):
+        f = imp.random_table(X[:8])
+        bf = imp.BitTable.from_table(f)
+        for x in X[:8]:
+            assert abs(imp.influence(bf, x) - imp.influence(f, x)) <= TOLERANCE
+            assert abs(imp.banzhaf(bf, x) - imp.banzhaf(f, x)) <= TOLERANCE
@@ -101,3 +101,73 @@ def test_alt_blame_decomposability():
         assert abs(b(g,"x0")*b(f_template, "z") - b(f,"x0")) <= TOLERANCE
 
 
+
+def test_table_blame_matches_fallback():
+    '''
+        checks whether the BFS-based blame and responsibility of tables coincide with
+        the generic implementations
+    '''
+    for _ in range(30):
+        f = imp.random_table(X[:4])
+        for modified in [False, True]:
+            for rho in rhos:
+                for cutoff in [0, 0.2]:
+                    b1 = imp.tables.blame(f, "x0", rho=rho, cutoff=cutoff, modified=modified)
+                    b2 = imp.fallback.blame(f, "x0", rho=rho, cutoff=cutoff, modified=modified)
+                    assert abs(b1[0]-b2[0]) <= TOLERANCE and abs(b1[1]-b2[1]) <= TOLERANCE
+                    assert type(b1[0]) in [int, float] and type(b1[1]) in [int, float]
+        for u in imp.iter_assignments(f.vars):
+            assert imp.tables.scs(f, "x0", u) == imp.fallback.scs(f, "x0", u)
+            assert imp.tables.d(f, u) == imp.fallback.d(f, u)
+            assert imp.tables.mscs(f, "x0", u) == imp.fallback.mscs(f, "x0", u)
+
+def test_mc_blame_batches():
+    '''
+        checks that counts are only requested up to the stopping level of the blame
+        (unless larger batches are requested)
+    '''
+    class CountingSolver(imp.DPLLCounter):
+        def __init__(self):
+            super().__init__(cache=False)
+            self.calls = 0
+        def _satcount(self, *args, **kwargs):
+            self.calls += 1
+            return super()._satcount(*args, **kwargs)
+
+    previous = imp.representation.get_pmc_solver()
+    f = imp.Formula.parse("x0 | x1 & x2 & x3 & x4")
+    try:
+        results = []
+        for batch in [1, 4]:
+            solver = CountingSolver()
+            imp.set_pmc_solver(solver)
+            results.append((imp.mc.blame(f, "x0", rho=lambda k: 2**(-k), cutoff=0.5, batch=batch), solver.calls))
+        (b1, calls1), (b4, calls4) = results
+        assert b1 == b4 and calls1 < calls4 == 4
+    finally:
+        imp.set_pmc_solver(previous)
+
+def test_flip_closure():
+    '''
+        checks whether the flip-closure of tables and BDDs agrees with its definition,
+        also when dynamic reordering of BDDs is enabled
+    '''
+    imp.buddy_initialize(list("xyzvw"))
+    for expr in ["x & (y ^ z)", "x | v -> ~w", "y <-> z & w", "0"]:
+        for S in [ {"x"}, {"y", "z"}, set("xyzvw") ]:
+            t = imp.Table.parse(expr)
+            expected = t
+            for y in S: expected = expected | t.flip(y)
+            assert t.flip_closure(S).equivalent(expected)
+            closure = imp.BuddyNode.parse(expr).flip_closure(S)
+            assert all(closure[ass] == expected[{ x: ass[x] for x in expected.vars }] for ass in imp.iter_assignments("xyzvw"))
+    # dynamic reordering is suspended during the pass and enabled again afterwards
+    imp.representation.set_dynamic_reordering(True)
+    try:
+        f = imp.BuddyNode.parse("x & (y ^ z) | v & ~w")
+        expected = f.to_table() | f.to_table().flip("y") | f.to_table().flip("v")
+        closure = f.flip_closure({"y", "v"})
+        assert imp.representation.buddy.DYNAMIC_REORDERING
+        assert all(closure[ass] == expected[{ x: ass[x] for x in expected.vars }] for ass in imp.iter_assignments("xyzvw"))
+    finally:
+        imp.representation.set_dynamic_reordering(False)
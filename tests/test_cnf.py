@@ -0,0 +1,52 @@
+import impmeas as imp
+import io
+import numpy as np
+
+imp.set_pmc_solver(imp.GPMC())
+
+def test_parse_dimacs():
+    '''
+        checks whether DIMACS files are parsed into balanced formulas and clause lists
+    '''
+    dimacs = "c example\np cnf 3 3\n1 -2 0\n2 3 0\n-1 -3 0"
+    formula, cnf, nvars, nclauses = imp.parse_dimacs(dimacs)
+    assert cnf == [[1,-2],[2,3],[-1,-3]] and nvars == 3 and nclauses == 3
+    assert imp.Table.parse(formula).equivalent(imp.Table.parse("(x1|~x2)&(x2|x3)&(~x1|~x3)"))
+    # conjunctions of many clauses are balanced
+    formula, _, _, _ = imp.parse_dimacs("\n".join(f"{i} {i+1} 0" for i in range(1, 5000)))
+    assert len(imp.Formula.parse(formula).vars) == 5000
+    assert imp.balanced("&", list("abcde")) == ("&", ("&", ("&", "a", "b"), ("&", "c", "d")), "e")
+
+def test_cnf_function():
+    '''
+        checks whether the operations of clause lists agree with the corresponding tables
+    '''
+    formula, cnf, nvars, _ = imp.parse_dimacs("p cnf 4 3\n1 -2 0\n2 3 0\n-1 -3 0")
+    f, t = imp.CNFFunction.from_clauses(cnf, nvars), imp.Table.parse(formula)
+    assert f.vars == ["x1", "x2", "x3", "x4"] and f.clauses == cnf
+    assert f.expectation() == t.expectation() == 0.25
+    for g, h in [ (f.cofactor({"x1": True}), t.cofactor({"x1": True})), (~f, ~t), (f.boolean_derivative("x2"), t.boolean_derivative("x2")), (f | imp.CNFFunction.var("x5"), t | imp.Table.var("x5")),
+                  ((f | imp.CNFFunction.var("x5")).boolean_derivative("x2"), (t | imp.Table.var("x5")).boolean_derivative("x2")) ]:
+        assert abs(g.expectation() - h.expectation()) < 1e-10
+        for ass in imp.iter_assignments(h.vars):
+            assert g[{ x: ass.get(x, False) for x in g.vars }] == h[ass]
+    # unit propagation detects the conflict of x3 and ~x3
+    assert f.cofactor({"x1": True, "x2": False}).clauses == [[]]
+
+def test_dimacs_streaming():
+    '''
+        checks whether CNFs are written and read clause by clause in DIMACS format
+    '''
+    cnf = [[1,-2],[2,3],[-1,-3]]
+    fw = io.StringIO()
+    imp.write_dimacs(cnf, fw, projected={1,2})
+    assert fw.getvalue() == imp.representation.cnf2dimacs(cnf, projected={1,2}) == "p cnf 3 3\nc t pmc\nc p show 1 2 0\n1 -2 0\n2 3 0\n-1 -3 0\n"
+    clauses, header = imp.read_dimacs(io.StringIO(fw.getvalue()))
+    assert list(clauses) == cnf and header == { "nr_vars": 3, "nr_clauses": 3, "show": {1,2} }
+    # rows of integer arrays are padded with zeros, clauses may span several lines
+    fw = io.StringIO()
+    imp.write_dimacs(np.array([[1,-2,0],[2,3,0],[-1,-3,4]]), fw)
+    assert fw.getvalue() == "p cnf 4 3\nc t mc\n1 -2 0\n2 3 0\n-1 -3 4 0\n"
+    _, parsed, nvars, nclauses = imp.parse_dimacs(io.StringIO("p cnf 3 2\n1 -2\n 0 2 3 0\n"))
+    assert parsed == [[1,-2],[2,3]] and nvars == 3 and nclauses == 2
+    assert imp.GPMC(stdin=True, cache=False).satcount(cnf, exists={3}) == imp.GPMC(cache=False).satcount(cnf, exists={3})
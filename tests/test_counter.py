@@ -0,0 +1,80 @@
+import impmeas as imp
+import random
+
+def test_dpll_counter():
+    '''
+        checks whether the in-process counter coincides with brute-force (projected) counting
+    '''
+    # small CNFs are enumerated, so the search is checked separately
+    counter, search = imp.DPLLCounter(cache=False), imp.DPLLCounter(cache=False, enumeration_limit=0)
+    for _ in range(100):
+        n = random.randint(1, 8)
+        cnf, _ = imp.random_k_cnf(n, random.randint(1, 10), random.randint(1, 3))
+        nr_vars = max(abs(lit) for cl in cnf for lit in cl)
+        exists = set(random.sample(range(1, nr_vars+1), random.randint(0, nr_vars//2)))
+        projected = [ v for v in range(1, nr_vars+1) if v not in exists ]
+        models = set()
+        for ass in imp.iter_assignments(range(1, nr_vars+1)):
+            if all(any(ass[abs(lit)] == (lit > 0) for lit in cl) for cl in cnf):
+                models.add(tuple(ass[v] for v in projected))
+        assert counter.satcount(cnf, exists=exists) == search.satcount(cnf, exists=exists) == len(models)
+
+def test_default_counter_random_3cnf():
+    '''
+        checks that the default counter agrees on random 3-CNFs with 40 variables and 120 clauses,
+        counted directly and as Tseitin encodings of formulas
+    '''
+    rng = random.Random(0)
+    previous = imp.representation.get_pmc_solver()
+    imp.set_pmc_solver(None)
+    try:
+        for _ in range(2):
+            cnf = [ [ rng.choice([1,-1])*v for v in rng.sample(range(1, 41), 3) ] for _ in range(120) ]
+            formula, _, nr_vars, _ = imp.parse_dimacs(imp.representation.cnf2dimacs(cnf))
+            f = imp.Formula.parse(formula)
+            count = imp.DPLLCounter(cache=False).satcount(cnf)
+            assert abs(f.expectation() - count / 2**nr_vars) < 1e-15
+    finally:
+        imp.set_pmc_solver(previous)
+
+def test_model_counter_interface():
+    counter = imp.DPLLCounter()
+    assert isinstance(counter, imp.ModelCounter) and isinstance(imp.GPMC(), imp.ModelCounter)
+    assert "in_process" in counter.capabilities and "projection" in counter.capabilities
+    assert counter.satcount_many([ [[1,2],[-1,3]], [[1],[-2]] ], exists={2}) == [3, 1]
+    assert counter.satcount([[1,2],[-1,3]]) == 4 and counter.cache.stats["hits"] == 0
+
+    previous = imp.representation.get_pmc_solver()
+    imp.set_pmc_solver(counter)
+    f = imp.Formula.parse("x & (y ^ z) | v & ~x")
+    assert f.expectation() == 0.5
+    assert abs(imp.banzhaf(f, "x") - imp.banzhaf(imp.Table.parse("x & (y ^ z) | v & ~x"), "x")) < 1e-10
+    imp.set_pmc_solver(None)
+    # without a solver, expectations are counted in-process as well
+    assert imp.Formula.parse("x | y").expectation() == 0.75
+    imp.set_pmc_solver(previous)
+
+def test_satcount_many():
+    '''
+        checks whether counting several CNFs concurrently agrees with counting them one by one
+    '''
+    solver = imp.GPMC(workers=3)
+    cnfs = [ [[1,2],[-1,3]], [[1],[-2]], [[1,-2,3]], [[-3],[2,3]] ]
+    assert solver.satcount_many(cnfs) == [ solver.satcount(cnf) for cnf in cnfs ] == [4, 1, 7, 2]
+    assert solver.satcount_many(cnfs, exists=[{2}, {2}, set(), {1}]) == [3, 1, 7, 1]
+    solver.close()
+
+def test_count_cache(tmp_path):
+    '''
+        checks whether model counts are cached (in memory and on disk) by a canonical hash of the query
+    '''
+    cache = imp.CountCache(maxsize=2, filename=str(tmp_path / "counts.sqlite"))
+    solver = imp.GPMC(cache=cache)
+    assert solver.satcount([[1,2],[-1,3]]) == solver.satcount([[3,-1],[2,1]]) == 4
+    assert cache.stats == { "hits": 1, "disk_hits": 0, "misses": 1, "size": 1 }
+    assert solver.satcount([[1,2],[-1,3]], exists={2}) == 3
+    assert solver.satcount([[1]]) == 1
+    assert solver.satcount([[1,2],[-1,3]]) == 4 # evicted from memory, but on disk
+    assert cache.stats["disk_hits"] == 1 and len(cache) == 2
+    cache.close()
+    assert imp.GPMC(cache=False).cache is None
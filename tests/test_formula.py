@@ -0,0 +1,60 @@
+import impmeas as imp
+
+imp.set_pmc_solver(imp.GPMC())
+
+def test_formula_dag():
+    '''
+        checks whether formulas are hash-consed and deep formulas are traversed without recursion
+    '''
+    assert imp.Formula.parse("x & (y ^ z)") is imp.Formula.parse("x&(y^z)")
+    f = imp.Formula.var("x0")
+    for i in range(1, 20000): f = f & imp.Formula.var(f"x{i%10}") if i%2 else f | ~imp.Formula.var(f"x{i%10}")
+    # deep formulas do not hit the recursion limit
+    assert len(f) == 49998 and f.vars == { f"x{i}" for i in range(10) }
+    assert f.cofactor({ "x0": True }).flip("x1").simplify().vars == f.vars - {"x0"}
+    assert f[{ f"x{i}": True for i in range(10) }]
+    assert len(f.tseitin()[0]) == 1 + 3*19999 + 2*9999
+    assert len(str(f)) > len(f)
+
+def test_formula_simplify():
+    '''
+        checks whether the simplification rules yield the expected (hash-consed) formulas
+    '''
+    F = imp.Formula
+    for expr, simplified in [("~~x & 1", "x"), ("(x ^ 1) ^ 1", "x"), ("(x | ~x) -> y", "y"), ("(x <-> 0) & ~(y <- y)", "0")]:
+        assert F.parse(expr).simplify() is F.parse(simplified)
+    a, b = F.var("x"), F.var("y")
+    assert F("&", a, F.true, b).simplify() is F("&", a, b)
+    assert F("|", a, F.true, b).simplify() is F.true
+    assert F("^", F.true, a, F.true, F.true).simplify() is F("~", a)
+
+def test_formula_cache():
+    '''
+        checks whether simplifications, Tseitin encodings and expectations of formulas are cached
+    '''
+    imp.clear_formula_cache()
+    solver = imp.GPMC(cache=imp.CountCache())
+    imp.set_pmc_solver(solver)
+    f = imp.Formula.parse("x & (y ^ z) | v & ~x")
+    assert f.expectation() == 0.5 and solver.cache.stats["misses"] == 1
+    assert f.expectation() == 0.5 and solver.cache.stats["misses"] + solver.cache.stats["hits"] == 1
+    assert f.tseitin() == f.tseitin() and f.tseitin() is not f.tseitin()
+    # modifying a returned clause does not change the cached encoding
+    cnf = f.tseitin()[0]
+    cnf[0].append(1)
+    assert f.tseitin()[0][0] == cnf[0][:-1]
+    assert f.simplify() is imp.Formula.parse("x & (y ^ z) | v & ~x").simplify()
+    imp.clear_formula_cache()
+    assert f.expectation() == 0.5 and solver.cache.stats["hits"] == 1
+    imp.set_pmc_solver(imp.GPMC())
+
+def test_mc_banzhaf_influence():
+    '''
+        checks whether the Banzhaf values and influences counted on a shared encoding agree with the definition
+    '''
+    for expr in ["x & (y ^ z) | v & ~x", "(x -> y) & (z <-> v)", "x ^ ~x", "y | ~x"]:
+        f, t = imp.Formula.parse(expr), imp.Table.parse(expr)
+        banzhaf, influence = imp.mc.banzhaf_all(f), imp.mc.influence_all(f)
+        for x in f.vars:
+            assert abs(banzhaf[x] - imp.fallback.banzhaf(t, x)) < 1e-10
+            assert abs(influence[x] - imp.fallback.influence(t, x)) < 1e-10
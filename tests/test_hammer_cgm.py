@@ -1,3 +1,4 @@
+import pytest
 import impmeas as imp
 from utils import X,Y
 from math import log2
@@ -79,3 +80,21 @@ def test_decomposition():
             Dg_E_f = E_f_template.derivative("z")
             Dx_E_g = E_g.derivative("x0")
             assert abs( Dx_E_f - Dx_E_g*Dg_E_f) <= TOLERANCE 
+
+def test_lattice():
+    '''
+        checks whether the lattice-based computation agrees with the definition
+    '''
+    for _ in range(20):
+        f = imp.random_table(X[:4])
+        for kappa in kappas:
+            lattice, definition = imp.hkr_cgm(f, kappa=kappa), imp.fallback.hkr(f, kappa=kappa)
+            assert all(abs(lattice[T] - definition[T]) <= TOLERANCE for T in imp.iter_assignments(f.vars))
+
+def test_lattice_limit():
+    '''
+        checks that tables whose lattice is too large are rejected instead of exhausting memory
+    '''
+    n = imp.tables.cgm.LATTICE_LIMIT+1
+    f = imp.Table.zeros([ f"x{i}" for i in range(n) ])
+    with pytest.raises(Exception, match="limit"): imp.hkr_cgm(f)
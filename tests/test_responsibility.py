@@ -1,4 +1,5 @@
 import impmeas as imp
+import numpy as np
 from utils import X,Y
 from random import randint
 
@@ -184,3 +185,32 @@ def test_resp_rank_SUD():
 
 
 
+
+def test_batched_responsibility():
+    '''
+        checks whether the batched variants coincide with scs, d and mscs for
+        tables, BDDs and the generic implementation (formulas)
+    '''
+    imp.buddy_initialize(X[:4])
+    for expr in ["x0 & (x1 ^ x2)", "(x0 | x1) & (x2 | ~x3)", "x0 <-> (x1 | x2)", "x1 | x2"]:
+        us = [ imp.random_assignment(X[:4]) for _ in range(10) ]
+        t = imp.Table.parse(expr)
+        matrix = imp.assignment_matrix(us, X[:4])
+        indices = np.array([ imp.assignment2index(u, X[:4]) for u in us ])
+        for f in [ t, imp.BuddyNode.parse(expr), imp.Formula.parse(expr) ]:
+            assert list(imp.d_many(f, us)) == [ imp.d(t, u) for u in us ]
+            assert list(imp.d_many(f, matrix, vars=X[:4])) == [ imp.d(t, u) for u in us ]
+            for c in [None, 0, 1]:
+                assert list(imp.scs_many(f, "x1", us, c=c)) == [ imp.scs(t, "x1", u, c) for u in us ]
+            assert list(imp.mscs_many(f, "x2", us)) == [ imp.mscs(t, "x2", u) for u in us ]
+            # indices of assignments to vars are accepted by all representations
+            assert list(imp.d_many(f, indices, vars=X[:4])) == [ imp.d(t, u) for u in us ]
+            assert list(imp.scs_many(f, "x1", indices, vars=X[:4])) == [ imp.scs(t, "x1", u) for u in us ]
+            assert list(imp.mscs_many(f, "x2", indices, vars=X[:4])) == [ imp.mscs(t, "x2", u) for u in us ]
+    # indices over the variables of a table need not assign x first
+    for expr in ["x & (y ^ z)", "y & (x ^ z)", "(z | y) & x"]:
+        t = imp.Table.parse(expr)
+        for x in t.vars:
+            expected = [ imp.mscs(t, x, imp.index2assignment(idx, t.vars)) for idx in range(8) ]
+            assert list(imp.mscs_many(t, x, np.arange(8))) == expected
+            assert list(imp.mscs_many(t, x, imp.assignment_matrix(list(imp.iter_assignments(t.vars)), t.vars))) == expected
@@ -0,0 +1,59 @@
+import impmeas as imp
+
+def test_table_evaluate():
+    '''
+        checks whether tables are evaluated consistently on assignments, indices and assignment matrices
+    '''
+    f = imp.Table.parse("x & (y ^ z) | v")
+    asss = list(imp.iter_assignments(f.vars))
+    values = [ f[ass] for ass in asss ]
+    assert [ f[idx] for idx in range(len(asss)) ] == values
+    assert list(f.evaluate(asss)) == values
+    assert list(f.evaluate(f.assignments2idx(asss))) == values
+    vars = list(reversed(f.vars))
+    assert list(f.evaluate(imp.assignment_matrix(asss, vars), vars=vars)) == values
+    b = imp.BitTable.parse("x & (y ^ z) | v")
+    assert [ b[b.assignment2idx(ass)] for ass in asss ] == [ b[ass] for ass in asss ]
+    # equal tables of different dtypes have equal hashes
+    x, y = imp.Table.var("x"), imp.Table.var("y")
+    assert (x | y) == x + y - x*y and hash(x | y) == hash(x + y - x*y)
+
+def test_table_broadcasting():
+    '''
+        checks whether operands of table operations are aligned in a deterministic variable order
+    '''
+    f, g = imp.Table.parse("x & (y ^ z)"), imp.Table.parse("v | ~y")
+    for h, vars in [(f & g, f.vars + ["v"]), (g & f, g.vars + [ x for x in f.vars if x not in g.vars ])]:
+        assert h.vars == vars
+        for ass in imp.iter_assignments(vars):
+            assert h[ass] == (f[ass] and g[ass])
+    assert (f + 2*g).vars == f.vars + ["v"]
+    assert f & g == g & f and f & g <= f and f | g >= g
+
+def test_iter_indices():
+    '''
+        checks whether the integer encodings of assignments agree with iter_assignments
+    '''
+    vars = ["x", "y", "z"]
+    asss = list(imp.iter_assignments(vars))
+    assert [ imp.index2assignment(idx, vars) for idx in imp.iter_indices(3) ] == asss
+    assert [ imp.assignment2index(ass, vars) for ass in asss ] == list(range(8))
+    assert [ block.tolist() for block in imp.iter_indices(3, chunk=3) ] == [[0,1,2], [3,4,5], [6,7]]
+    # projection onto and merging of disjoint assignments
+    for idx, ass in enumerate(asss):
+        assert imp.reindex(idx, vars, ["z", "x"]) == imp.assignment2index(ass, ["z", "x"])
+        assert imp.reindex(imp.reindex(idx, vars, ["z", "x"]), ["z", "x"], vars) | imp.reindex(ass["y"], ["y"], vars) == idx
+        assert imp.popcount(idx) == sum(ass.values())
+    f = imp.Formula.parse("x & (y ^ z)")
+    assert [ v for block in f.iter_values(vars, chunk=3) for v in block ] == [ f[ass] for ass in asss ]
+
+def test_prime_implicants():
+    '''
+        checks whether the prime implicants of a table are computed and invalidated by assignments
+    '''
+    t = imp.Table.parse("x & y | ~x & z")
+    assert sorted(sorted(p.items()) for p in t.prime_implicants()) == \
+        [ [("x", False), ("z", True)], [("x", True), ("y", True)], [("y", True), ("z", True)] ]
+    t[{ "x": False, "y": False, "z": True }] = 0 # invalidates the cached primes
+    assert sorted(sorted(p.items()) for p in t.prime_implicants()) == \
+        [ [("x", True), ("y", True)], [("y", True), ("z", True)] ]